@@ -0,0 +1,35 @@
+"""
+Offline benchmarks for python-misfit, using the recorded responses in
+tests/files/responses. Run each one from the top of the repository with
+``python -m benchmarks.<name>``.
+"""
+import json
+import timeit
+
+
+RESPONSES_PATH = 'tests/files/responses/%s.json'
+
+
+def load_response(name):
+    """ The raw bytes of a recorded response """
+    with open(RESPONSES_PATH % name, 'rb') as response_file:
+        return response_file.read()
+
+
+def load_records(name, key, count):
+    """
+    ``count`` records built by repeating the ``key`` list of a recorded
+    response, to stand in for a long date range
+    """
+    records = json.loads(load_response(name).decode('utf8'))[key]
+    return [records[i % len(records)] for i in range(count)]
+
+
+def bench(func, number=10, repeat=5):
+    """ The best time of ``repeat`` runs of ``number`` calls, per call """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def report(name, seconds, per=1):
+    """ Print a result in microseconds, divided by ``per`` items """
+    print('%-48s %12.3f us' % (name, seconds * 1e6 / per))
@@ -0,0 +1,54 @@
+"""
+Decoding time of each installed JSON backend, for the recorded API responses
+and for an SNS notification carrying a batch of messages.
+"""
+import json
+
+from misfit import codec
+
+from . import bench, load_response, report
+
+
+MESSAGES = 500
+
+
+def notification():
+    """ An SNS notification body with MESSAGES messages """
+    message = {'type': 'sessions', 'action': 'updated',
+               'id': '51a4189acf12e53f81000001',
+               'ownerId': '51a4189acf12e53f80000001',
+               'updatedAt': '2014-10-05T10:26:54-04:00'}
+    return json.dumps({
+        'Type': 'Notification',
+        'MessageId': 'f3f0c3e3-5e7e-5a3b-a8f6-4d0e8b4e4f23',
+        'TopicArn': 'arn:aws:sns:us-east-1:819895241319:resource-api',
+        'Message': json.dumps([message] * MESSAGES),
+        'Timestamp': '2014-10-05T14:26:54.503Z',
+    }).encode('utf8')
+
+
+def decode_notification(body):
+    """ Decode the envelope, then the message list, as notifications do """
+    return codec.loads(codec.loads(body)['Message'])
+
+
+def main():
+    samples = [(name, load_response(name)) for name in
+               ['goal', 'summary_detail', 'session', 'sleep']]
+    body = notification()
+    for name in codec.BACKENDS:
+        try:
+            codec.set_backend(name)
+        except ImportError:
+            print('%s: not installed' % name)
+            continue
+        for sample, content in samples:
+            report('%s: %s' % (name, sample),
+                   bench(lambda: codec.loads(content), number=1000))
+        report('%s: notification, %d messages' % (name, MESSAGES),
+               bench(lambda: decode_notification(body), number=100))
+    codec.set_backend()
+
+
+if __name__ == '__main__':
+    main()
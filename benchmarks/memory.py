@@ -0,0 +1,53 @@
+"""
+Memory held per object for summaries, sessions and sleeps, as regular Misfit
+objects and as compact records with and without the raw response. Needs
+Python 3.4+ for tracemalloc.
+"""
+import gc
+import json
+import tracemalloc
+
+from misfit.compact import compact_classes
+from misfit.misfit import OBJECT_CLASSES
+
+from . import load_response
+
+
+COUNT = 10000
+
+
+def measure(cls, name, key):
+    """
+    Bytes per object held by COUNT objects built from freshly decoded
+    responses, before and after every field has been read
+    """
+    content = load_response(name).decode('utf8')
+    gc.collect()
+    tracemalloc.start()
+    objects = [cls(json.loads(content)[key][0]) for i in range(COUNT)]
+    gc.collect()
+    unread = tracemalloc.get_traced_memory()[0]
+    for obj in objects:
+        for field in obj.data:
+            getattr(obj, field)
+    gc.collect()
+    read = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return float(unread) / COUNT, float(read) / COUNT
+
+
+def main():
+    print('%-36s %12s %12s' % ('bytes per object', 'unread', 'all read'))
+    for label, classes in [
+            ('regular', OBJECT_CLASSES),
+            ('compact', compact_classes()),
+            ('compact, keep_data', compact_classes(keep_data=True))]:
+        for method, name, key in [('summary', 'summary_detail', 'summary'),
+                                  ('session', 'session', 'sessions'),
+                                  ('sleep', 'sleep', 'sleeps')]:
+            print('%-36s %12.0f %12.0f' % (('%s: %s' % (label, method),) +
+                                          measure(classes[method], name, key)))
+
+
+if __name__ == '__main__':
+    main()
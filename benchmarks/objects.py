@@ -0,0 +1,82 @@
+"""
+Cost of building Misfit objects for a year of sessions and sleeps, eagerly
+converting every field as python-misfit 0.3.2 did, and lazily, and of reading
+sleep details as objects and as arrays.
+"""
+from misfit.misfit import MisfitObject, MisfitSession, MisfitSleep
+
+from . import bench, load_records, report
+
+
+COUNT = 10000
+
+
+class EagerObject(MisfitObject):
+    """ Convert every field up front, like python-misfit 0.3.2 """
+    def __init__(self, data):
+        self.data = data
+        for name, value in self.data.items():
+            self.set_value(name, value)
+
+
+class EagerSession(EagerObject):
+    pass
+
+
+class EagerSleepDetail(EagerObject):
+    pass
+
+
+class EagerSleep(EagerObject):
+    def __init__(self, data):
+        super(EagerSleep, self).__init__(data)
+        self.sleepDetails = [EagerSleepDetail(sleep_detail)
+                             for sleep_detail in self.sleepDetails]
+
+
+def construct(cls, records):
+    return [cls(record) for record in records]
+
+
+def read(cls, records, *names):
+    for obj in construct(cls, records):
+        for name in names:
+            getattr(obj, name)
+
+
+def read_details(records):
+    for obj in construct(MisfitSleep, records):
+        for sleep_detail in obj.sleepDetails:
+            sleep_detail.datetime
+
+
+def read_detail_arrays(records):
+    for obj in construct(MisfitSleep, records):
+        obj.detail_arrays()
+
+
+def main():
+    sessions = load_records('session', 'sessions', COUNT)
+    sleeps = load_records('sleep', 'sleeps', COUNT)
+    for label, eager, lazy, records, used in [
+            ('session', EagerSession, MisfitSession, sessions,
+             ('startTime', 'duration')),
+            ('sleep', EagerSleep, MisfitSleep, sleeps,
+             ('startTime', 'duration', 'autoDetected'))]:
+        report('%s: eager construct' % label,
+               bench(lambda: construct(eager, records), number=1), COUNT)
+        report('%s: lazy construct' % label,
+               bench(lambda: construct(lazy, records), number=1), COUNT)
+        report('%s: lazy construct, read %d fields' % (label, len(used)),
+               bench(lambda: read(lazy, records, *used), number=1), COUNT)
+        report('%s: lazy construct, read every field' % label,
+               bench(lambda: read(lazy, records, *records[0]), number=1),
+               COUNT)
+    report('sleep: lazy construct, read every detail datetime',
+           bench(lambda: read_details(sleeps), number=1), COUNT)
+    report('sleep: lazy construct, detail_arrays()',
+           bench(lambda: read_detail_arrays(sleeps), number=1), COUNT)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+The benchmark suite, run offline against the recorded responses and a local
+mock of the API. Results are printed and saved as JSON, so two runs can be
+compared: ::
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --output after.json
+    python -m benchmarks.suite --compare before.json after.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import threading
+
+from base64 import standard_b64encode
+from six.moves import BaseHTTPServer, socketserver
+from slumber.exceptions import HttpClientError, HttpServerError
+
+import misfit
+
+from misfit import Misfit
+from misfit.exceptions import MisfitHttpException
+from misfit.misfit import OBJECT_CLASSES
+from misfit.notification import (
+    MisfitCertificateCache,
+    MisfitNotification,
+    string_to_sign,
+    verify_notifications
+)
+
+from . import bench, load_records, load_response, report
+
+
+COUNT = 1000
+
+# Records of the resources that have no recorded response
+PROFILE = {'userId': '51a4189acf12e53f79000001', 'name': 'Misfit',
+           'birthday': '1983-09-21', 'gender': 'male', 'email': 'a@b.com'}
+DEVICE = {'id': '51a4189acf12e53f80000001', 'deviceType': 'shine',
+          'serialNumber': 'XXXXXV1234', 'firmwareVersion': '0.0.50r',
+          'batteryLevel': 40, 'lastSyncTime': 1416447060}
+
+MESSAGE = {'type': 'sessions', 'action': 'updated',
+           'id': '51a4189acf12e53f82000001',
+           'ownerId': '51a4189acf12e53f79000001',
+           'updatedAt': '2014-10-05T14:26:54Z'}
+
+
+class MockApi(BaseHTTPServer.BaseHTTPRequestHandler):
+    """ Answers detail summaries and the SNS signing certificate """
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, so don't let them wait on
+    # delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if '/activity/summary/' in self.path:
+            content = load_response('summary_detail')
+        elif self.path == '/cert.pem':
+            with open('tests/files/certificate.pem', 'rb') as cert_file:
+                content = cert_file.read()
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """ A thread per connection, since clients keep theirs open """
+    daemon_threads = True
+
+
+def start_server():
+    """ Serve MockApi on a free local port in a daemon thread """
+    # The mock is plain HTTP, which OAuth 2 only allows when told to
+    os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
+    server = MockServer(('127.0.0.1', 0), MockApi)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, 'http://127.0.0.1:%d/' % server.server_port
+
+
+def notification_body(messages, cert_url=None):
+    """
+    An SNS notification with ``messages`` copies of MESSAGE, signed with the
+    test key when a signing certificate URL is given
+    """
+    data = {'Type': 'Notification', 'MessageId': 'message-id',
+            'TopicArn': 'topic-arn',
+            'Message': json.dumps([MESSAGE] * messages),
+            'Timestamp': '2014-10-05T14:26:55.182Z'}
+    if cert_url:
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric.padding import (
+            PKCS1v15)
+        with open('tests/files/privkey.pem', 'rb') as key_file:
+            key = serialization.load_pem_private_key(
+                key_file.read(), None, default_backend())
+        data.update(SignatureVersion='1', SigningCertURL=cert_url)
+        data['Signature'] = standard_b64encode(key.sign(
+            string_to_sign(data), PKCS1v15(), hashes.SHA1())).decode('utf8')
+    return json.dumps(data).encode('utf8')
+
+
+def build_exception(exc):
+    try:
+        MisfitHttpException.build_exception(exc)
+    except MisfitHttpException:
+        pass
+
+
+class LocalCertificates(MisfitCertificateCache):
+    """ Trusts the mock API's plain HTTP certificate URL """
+    def is_trusted(self, url):
+        return True
+
+
+class FakeResponse(object):
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def object_cases():
+    records = {
+        'profile': [PROFILE] * COUNT,
+        'device': [DEVICE] * COUNT,
+        'goal': load_records('goal', 'goals', COUNT),
+        'summary': load_records('summary_detail', 'summary', COUNT),
+        'session': load_records('session', 'sessions', COUNT),
+        'sleep': load_records('sleep', 'sleeps', COUNT)
+    }
+    for resource in sorted(records):
+        cls, resource_records = OBJECT_CLASSES[resource], records[resource]
+        yield ('objects.%s.construct' % resource, COUNT,
+               lambda cls=cls, resource_records=resource_records:
+               [cls(record) for record in resource_records])
+
+        def read_all(cls=cls, resource_records=resource_records):
+            for record in resource_records:
+                obj = cls(record)
+                for name in record:
+                    getattr(obj, name)
+        yield 'objects.%s.read_all' % resource, COUNT, read_all
+
+
+def client_cases(api_url):
+    client = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN', api_url=api_url)
+    yield ('client.summary_detail', 1,
+           lambda: client.summary('2014-10-05', '2014-10-07', detail=True))
+    direct = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN', api_url=api_url,
+                    direct=True)
+    yield ('client.summary_detail.direct', 1,
+           lambda: direct.summary('2014-10-05', '2014-10-07', detail=True))
+
+
+def notification_cases(api_url):
+    for messages in [1, 100]:
+        body = notification_body(messages)
+        yield ('notification.parse.%d_messages' % messages, 1,
+               lambda body=body: MisfitNotification(body))
+    body = notification_body(1, api_url + 'cert.pem')
+    certificates = LocalCertificates()
+    yield ('notification.verify', 1,
+           lambda: MisfitNotification(body, certificates))
+    bodies = [body] * 100
+    yield ('notification.verify_batch.100', 100,
+           lambda: verify_notifications(bodies, certificates=certificates))
+    # Fetching and parsing the certificate every time
+    uncached = LocalCertificates(ttl=-1)
+    yield ('notification.verify.uncached', 1,
+           lambda: MisfitNotification(body, uncached))
+
+
+def exception_cases():
+    for code, content, exc_class in [
+            (404, b'Cannot GET /move/resource/v1/user/me/profile/404/\n',
+             HttpClientError),
+            (429, b'{"error_code": 429, "error_message": "Rate limit"}',
+             HttpClientError),
+            (500, b"I HAVE NO IDEA WHAT'S GOING ON!", HttpServerError)]:
+        exc = exc_class('Error %d' % code, response=FakeResponse(code),
+                        content=content)
+        yield ('exceptions.build_exception.%d' % code, 1,
+               lambda exc=exc: build_exception(exc))
+
+
+def run(number):
+    """ Run every case, returning a dict of name to seconds per item """
+    server, api_url = start_server()
+    try:
+        results = {}
+        for cases in [object_cases(), client_cases(api_url),
+                      notification_cases(api_url), exception_cases()]:
+            for name, per, func in cases:
+                func()  # Warm up caches and connections
+                seconds = bench(func, number=number) / per
+                report(name, seconds)
+                results[name] = seconds
+        return results
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def compare(before_path, after_path):
+    """ Print how each result changed between two saved runs """
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    print('%-48s %12s %12s %8s' % ('', before['misfit'], after['misfit'],
+                                   'change'))
+    for name in sorted(set(before['results']) | set(after['results'])):
+        old, new = before['results'].get(name), after['results'].get(name)
+        print('%-48s %12s %12s %8s' % (
+            name, '%.3f us' % (old * 1e6) if old else '-',
+            '%.3f us' % (new * 1e6) if new else '-',
+            '%+.0f%%' % ((new / old - 1) * 100) if old and new else ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('.')[0])
+    parser.add_argument('--output', default='benchmark-results.json',
+                        help='Where to save the results')
+    parser.add_argument('--number', type=int, default=20,
+                        help='Calls of each case per timing')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help='Compare two saved runs instead')
+    args = parser.parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+    results = run(args.number)
+    with open(args.output, 'w') as output_file:
+        json.dump({
+            'misfit': misfit.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.utcnow().isoformat(),
+            'unit': 'seconds per item',
+            'results': results
+        }, output_file, indent=2, sort_keys=True)
+    print('Results saved to %s' % args.output)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
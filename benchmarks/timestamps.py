@@ -0,0 +1,61 @@
+"""
+Converting every timestamp field of the recorded responses with arrow.get, as
+python-misfit 0.3.2 did, and with misfit.timestamps, with and without its
+memo.
+"""
+import arrow
+import json
+import os
+
+from misfit import timestamps
+from misfit.misfit import TIMESTAMP_FIELDS
+
+from . import RESPONSES_PATH, bench, load_response, report
+
+
+# Convert each recorded value this many times over, standing in for a year of
+# records that share their dates
+REPEAT = 100
+
+
+def timestamp_values(data):
+    """ The values of every timestamp field in a decoded response """
+    if isinstance(data, list):
+        return [value for item in data for value in timestamp_values(item)]
+    if not isinstance(data, dict):
+        return []
+    values = []
+    for name, value in data.items():
+        if name in TIMESTAMP_FIELDS:
+            values.append(value)
+        else:
+            values.extend(timestamp_values(value))
+    return values
+
+
+def convert_cold(values, timestamp_type):
+    for memo in timestamps._memos.values():
+        memo.clear()
+    for value in values:
+        timestamps.convert(value, timestamp_type)
+
+
+def main():
+    names = sorted(os.path.splitext(name)[0] for name in
+                   os.listdir(os.path.dirname(RESPONSES_PATH)))
+    values = [value for name in names for value in timestamp_values(
+        json.loads(load_response(name).decode('utf8')))] * REPEAT
+    print('%d timestamps from %s' % (len(values), ', '.join(names)))
+    report('arrow.get', bench(lambda: [arrow.get(v) for v in values],
+                              number=1), len(values))
+    for timestamp_type in timestamps.TIMESTAMP_TYPES:
+        report('convert to %s, memo cleared first' % timestamp_type,
+               bench(lambda: convert_cold(values, timestamp_type), number=1),
+               len(values))
+        report('parse to %s, no memo' % timestamp_type,
+               bench(lambda: [timestamps._parse(v, timestamp_type)
+                              for v in values], number=1), len(values))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Client-side overhead per request of the slumber path and of direct requests
+(``Misfit(..., direct=True)``). The transport answers every request with a
+recorded response, so no time is spent on the network.
+"""
+import requests
+
+from misfit import Misfit
+from misfit.transport import MisfitTransport
+
+from . import bench, load_response, report
+
+
+class RecordedTransport(MisfitTransport):
+    """ A transport that answers every request with the same response """
+    def __init__(self, content):
+        super(RecordedTransport, self).__init__()
+        self.content = content
+
+    def request(self, method, url, **kwargs):
+        # Prepare the request as requests would, auth included, so only
+        # sending it is skipped
+        prepared = self.session.prepare_request(requests.Request(
+            method, url, params=kwargs.get('params'),
+            headers=kwargs.get('headers'), auth=kwargs.get('auth')))
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['content-type'] = 'application/json; charset=utf-8'
+        response._content = self.content
+        response.request = prepared
+        return response
+
+
+def main():
+    single = RecordedTransport(load_response('goal_single'))
+    summary = RecordedTransport(load_response('summary'))
+    for label, direct in [('slumber', False), ('direct', True)]:
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        transport=single, direct=direct)
+        report('%s: goal(object_id=...)' % label, bench(
+            lambda: misfit.goal(object_id='51a4189acf12e53f81000001'),
+            number=1000))
+        misfit.transport = summary
+        report('%s: summary(start_date, end_date)' % label, bench(
+            lambda: misfit.summary('2014-10-05', '2014-10-07'),
+            number=1000))
+
+
+if __name__ == '__main__':
+    main()
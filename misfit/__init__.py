@@ -2,20 +2,10 @@
 Misfit API Python Client Implementation. Facilitates connection to Misfit's
 `REST API <https://build.misfit.com/docs/>`_ and retrieving user data.
 """
+import importlib
+import sys
 
 
-from .misfit import (
-    API_URL,
-    Misfit,
-    MisfitProfile,
-    MisfitDevice,
-    MisfitGoal,
-    MisfitSummary,
-    MisfitSession,
-    MisfitSleepDetail,
-    MisfitSleep
-)
-
 __all__ = ['API_URL', 'Misfit', 'MisfitProfile', 'MisfitDevice', 'MisfitGoal',
            'MisfitSummary', 'MisfitSession', 'MisfitSleepDetail',
            'MisfitSleep']
@@ -26,3 +16,30 @@ __copyright__ = 'Copyright 2014-2015 ORCAS'
 __license__ = 'Apache 2.0'
 __version__ = '0.3.2'
 __release__ = __version__
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """
+        Load misfit.misfit, and with it arrow, slumber and oauthlib, when one
+        of its names is first used rather than on import, so the CLI and
+        worker processes that don't use them start faster
+        """
+        if name not in __all__:
+            raise AttributeError(
+                "module 'misfit' has no attribute '%s'" % name)
+        return getattr(importlib.import_module('.misfit', __name__), name)
+
+    def __dir__():
+        return sorted(list(globals()) + __all__)
+else:
+    from .misfit import (
+        API_URL,
+        Misfit,
+        MisfitProfile,
+        MisfitDevice,
+        MisfitGoal,
+        MisfitSummary,
+        MisfitSession,
+        MisfitSleepDetail,
+        MisfitSleep
+    )
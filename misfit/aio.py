@@ -0,0 +1,138 @@
+"""
+Asyncio Misfit API client. Requires Python 3.5+ and
+`aiohttp <https://aiohttp.readthedocs.io/>`_ (``pip install misfit[async]``).
+"""
+import asyncio
+
+from . import codec
+from .exceptions import MisfitHttpException
+from .misfit import (
+    API_URL,
+    MAX_RANGE_DAYS,
+    DateRangeMixin,
+    MisfitProfile,
+    MisfitDevice,
+    MisfitGoal,
+    MisfitSummary,
+    MisfitSession,
+    MisfitSleep
+)
+
+
+class AsyncMisfit(DateRangeMixin):
+    """
+    Awaitable version of :code:`misfit.Misfit`. It returns the same Misfit
+    objects and raises the same exceptions.
+
+    Pass an :code:`aiohttp.ClientSession` as ``client_session`` to share one
+    connection pool between many users, otherwise one is created on first use
+    and closed by :code:`close`.
+    """
+    def __init__(self, client_id, client_secret, access_token, user_id=None,
+                 client_session=None, max_range_days=MAX_RANGE_DAYS,
+                 max_workers=4):
+        user = user_id if user_id else 'me'
+        self.base_url = '%smove/resource/v1/user/%s/' % (API_URL, user)
+        self.headers = {'Authorization': 'Bearer %s' % access_token,
+                        'Accept': 'application/json'}
+        self.client_session = client_session
+        self.owns_session = client_session is None
+        self.max_range_days = max_range_days
+        self.max_workers = max_workers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """ Close the aiohttp session, if we created it """
+        if self.owns_session and self.client_session is not None:
+            await self.client_session.close()
+            self.client_session = None
+
+    async def profile(self, object_id=None):
+        return MisfitProfile(await self._get_object('profile', object_id))
+
+    async def device(self, object_id=None):
+        return MisfitDevice(await self._get_object('device', object_id))
+
+    async def goal(self, start_date=None, end_date=None, object_id=None):
+        self._check_date_range_or_id(start_date, end_date, object_id)
+        if object_id is None:
+            return [MisfitGoal(goal) for goal in await self._get_range(
+                'activity/goals', 'goals', start_date, end_date)]
+        return MisfitGoal(await self._get_object(
+            'activity/goals', object_id,
+            start_date=start_date, end_date=end_date))
+
+    async def summary(self, start_date, end_date, detail=False):
+        if detail:
+            return [MisfitSummary(summ) for summ in await self._get_range(
+                'activity/summary', 'summary', start_date, end_date,
+                detail='true')]
+        summaries = await self._get_windows(
+            'activity/summary', start_date, end_date, detail='false')
+        if len(summaries) == 1 and 'summary' in summaries[0]:
+            return [MisfitSummary(summ) for summ in summaries[0]['summary']]
+        return MisfitSummary(self._add_summaries(summaries))
+
+    async def session(self, start_date=None, end_date=None, object_id=None):
+        self._check_date_range_or_id(start_date, end_date, object_id)
+        if object_id is None:
+            sessions = await self._get_range(
+                'activity/sessions', 'sessions', start_date, end_date)
+            return [MisfitSession(session) for session in sessions]
+        return MisfitSession(await self._get_object(
+            'activity/sessions', object_id,
+            start_date=start_date, end_date=end_date))
+
+    async def sleep(self, start_date=None, end_date=None, object_id=None):
+        self._check_date_range_or_id(start_date, end_date, object_id)
+        if object_id is None:
+            return [MisfitSleep(sleep) for sleep in await self._get_range(
+                'activity/sleeps', 'sleeps', start_date, end_date)]
+        return MisfitSleep(await self._get_object(
+            'activity/sleeps', object_id,
+            start_date=start_date, end_date=end_date))
+
+    async def _get_windows(self, path, start_date, end_date, **kwargs):
+        """
+        Fetch a date range one window at a time, with at most max_workers
+        windows in flight. Returns the responses in date order.
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def fetch(window):
+            async with semaphore:
+                return await self._get_object(
+                    path, start_date=window[0], end_date=window[1], **kwargs)
+
+        return await asyncio.gather(*[
+            fetch(window)
+            for window in self._date_windows(start_date, end_date)])
+
+    async def _get_range(self, path, key, start_date, end_date, **kwargs):
+        """ Fetch a date range and merge the ``key`` lists of every window """
+        records = []
+        for response in await self._get_windows(
+                path, start_date, end_date, **kwargs):
+            records.extend(response[key])
+        return records
+
+    async def _get_object(self, path, object_id=None, **kwargs):
+        if self.client_session is None:
+            import aiohttp
+            self.client_session = aiohttp.ClientSession()
+        url = '%s%s/' % (self.base_url, path)
+        if object_id:
+            url = '%s%s/' % (url, object_id)
+        params = dict((k, v) for k, v in kwargs.items() if v is not None)
+        async with self.client_session.get(
+                url, params=params, headers=self.headers) as response:
+            content = await response.read()
+        if response.status >= 400:
+            MisfitHttpException.build_from_content(
+                response.status, 'Unknown error', content, response)
+        return codec.loads(content)
@@ -1,6 +1,5 @@
 from __future__ import absolute_import
 
-import cherrypy
 import os
 import sys
 import threading
@@ -72,9 +71,9 @@ class MisfitAuth:
         url = self.authorize_url()
         # Open the web browser in a new thread for command-line browser support
         threading.Timer(1, webbrowser.open, args=(url,)).start()
+        import cherrypy
         cherrypy.quickstart(self)
 
-    @cherrypy.expose
     def index(self, state, code=None, error=None):
         """
         Receive a Misfit response containing a verification code. Use the code
@@ -95,6 +94,8 @@ class MisfitAuth:
         # Use a thread to shutdown cherrypy so we can return HTML first
         self._shutdown_cherrypy()
         return error if error else self.success_html
+    # Served by CherryPy, which is only imported by browser_authorize
+    index.exposed = True
 
     def _fmt_failure(self, message):
         tb = traceback.format_tb(sys.exc_info()[2])
@@ -103,5 +104,6 @@ class MisfitAuth:
 
     def _shutdown_cherrypy(self):
         """ Shutdown cherrypy in one second, if it's running """
+        import cherrypy
         if cherrypy.engine.state == cherrypy.engine.states.STARTED:
             threading.Timer(1, cherrypy.engine.exit).start()
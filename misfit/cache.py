@@ -0,0 +1,186 @@
+"""
+Caching Misfit API responses. Give a cache to a Misfit client and it will
+only ask the API for resources it hasn't seen recently: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.cache import MisfitMemoryCache
+    >>> cache = MisfitMemoryCache(maxsize=10000, ttls={'profile': 86400})
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>,
+    ...                 cache=cache)
+
+Responses are cached by user, resource path (``profile``, ``device``,
+``activity/goals``, ``activity/summary``, ``activity/sessions`` or
+``activity/sleeps``), object id and query parameters. Date ranges that ended
+before yesterday won't change much, so they are kept for ``history_ttl``
+seconds instead.
+
+A cache given as ``range_cache`` instead keeps date ranges of goals, detailed
+summaries, sessions and sleeps a day at a time, so a range overlapping earlier
+ones only fetches the days that weren't covered yet: ::
+
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>,
+    ...                 range_cache=MisfitMemoryCache(maxsize=100000))
+    >>> misfit.summary('2015-01-01', '2015-03-31', detail=True)
+    >>> misfit.summary('2015-03-01', '2015-04-30', detail=True)  # April only
+"""
+import abc
+import arrow
+import json
+import six
+import sqlite3
+import threading
+import time
+
+from arrow.parser import ParserError
+from collections import OrderedDict
+from datetime import timedelta
+
+from . import codec
+
+
+@six.add_metaclass(abc.ABCMeta)
+class MisfitCache(object):
+    """
+    Base class of the cache backends. Subclasses store values with
+    :code:`get` and :code:`set`.
+    """
+    def __init__(self, maxsize=1024, ttl=300, ttls=None, history_ttl=86400):
+        """
+        - maxsize: The most responses to keep, evicting the least recently
+          used
+        - ttl: Seconds to keep a response for
+        - ttls: A dict of resource path to seconds, overriding ttl
+        - history_ttl: Seconds to keep a date range that ended before
+          yesterday, or None to use the ttl of its resource
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = {'profile': 3600, 'device': 3600}
+        self.ttls.update(ttls or {})
+        self.history_ttl = history_ttl
+        self.lock = threading.Lock()
+
+    def key(self, user, path, object_id, params):
+        """
+        The cache key of a request, as a string. Parameters like dates are
+        turned into strings the way requests sends them.
+        """
+        params = dict((k, v) for k, v in params.items() if v is not None)
+        return json.dumps([user, path, object_id, params], sort_keys=True,
+                          default=str)
+
+    def ttl_for(self, path, params):
+        """ Seconds to cache a response to a request for path with params """
+        if self.history_ttl is not None and params.get('end_date'):
+            try:
+                end = arrow.get(params['end_date']).date()
+            except (ParserError, TypeError, ValueError):
+                pass
+            else:
+                if end < arrow.utcnow().date() - timedelta(days=1):
+                    return self.history_ttl
+        return self.ttls.get(path, self.ttl)
+
+    @abc.abstractmethod
+    def get(self, key):
+        """ The value cached under key, or None """
+
+    @abc.abstractmethod
+    def set(self, key, value, ttl):
+        """ Cache value under key for ttl seconds """
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """ Forget the value cached under key, if any """
+
+    @abc.abstractmethod
+    def clear(self):
+        """ Forget everything """
+
+
+class MisfitMemoryCache(MisfitCache):
+    """ Keeps responses in a dict, shared by all threads of the process """
+    def __init__(self, *args, **kwargs):
+        super(MisfitMemoryCache, self).__init__(*args, **kwargs)
+        self.values = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.values:
+                return None
+            expires, value = self.values.pop(key)
+            if expires < time.time():
+                return None
+            # Move the key to the most recently used end
+            self.values[key] = (expires, value)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.values.pop(key, None)
+            self.values[key] = (time.time() + ttl, value)
+            while len(self.values) > self.maxsize:
+                self.values.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.values.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+class MisfitSqliteCache(MisfitCache):
+    """
+    Keeps responses in a SQLite database, so they survive restarts and can
+    be shared between processes
+    """
+    def __init__(self, path, *args, **kwargs):
+        super(MisfitSqliteCache, self).__init__(*args, **kwargs)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS misfit_cache ('
+                'key TEXT PRIMARY KEY, value TEXT, expires REAL, used REAL)')
+            self.db.execute(
+                'CREATE INDEX IF NOT EXISTS misfit_cache_used '
+                'ON misfit_cache (used)')
+
+    def get(self, key):
+        now = time.time()
+        with self.lock, self.db:
+            row = self.db.execute(
+                'SELECT value, expires FROM misfit_cache WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self.db.execute('DELETE FROM misfit_cache WHERE key = ?',
+                                (key,))
+                return None
+            self.db.execute('UPDATE misfit_cache SET used = ? WHERE key = ?',
+                            (now, key))
+        return codec.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO misfit_cache VALUES (?, ?, ?, ?)',
+                (key, codec.dumps(value), now + ttl, now))
+            self.db.execute(
+                'DELETE FROM misfit_cache WHERE key IN ('
+                'SELECT key FROM misfit_cache ORDER BY used DESC '
+                'LIMIT -1 OFFSET ?)', (self.maxsize,))
+
+    def delete(self, key):
+        with self.lock, self.db:
+            self.db.execute('DELETE FROM misfit_cache WHERE key = ?', (key,))
+
+    def clear(self):
+        with self.lock, self.db:
+            self.db.execute('DELETE FROM misfit_cache')
+
+    def close(self):
+        self.db.close()
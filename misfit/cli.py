@@ -9,6 +9,7 @@ Usage:
   misfit summary --start_date=<start_date> --end_date=<end_date> [--detail] [--user_id=<user_id>] [--config=<config_file>]
   misfit session (--start_date=<start_date> --end_date=<end_date>|--object_id=<object_id>) [--user_id=<user_id>] [--config=<config_file>]
   misfit sleep (--start_date=<start_date> --end_date=<end_date>|--object_id=<object_id>) [--user_id=<user_id>] [--config=<config_file>]
+  misfit webhook [--host=<host>] [--port=<port>] [--queue_size=<queue_size>] [--concurrency=<concurrency>] [--spill=<spill_file>]
   misfit --version
   misfit --help
 
@@ -23,17 +24,22 @@ Options:
   --start_date=<start_date         Date at the start of a range: Eg. 2014-11-20.
   --end_date=<end_date>            Date at the end of a range: Eg. 2014-11-30.
   --detail                         If specified, print summary detail for each day.
+  --host=<host>                    Address to receive notifications on [default: 127.0.0.1]
+  --port=<port>                    Port to receive notifications on [default: 8080]
+  --queue_size=<queue_size>        Most notification messages to hold [default: 1000]
+  --concurrency=<concurrency>      Most notifications to verify at once [default: 4]
+  --spill=<spill_file>             Spill messages to this file when the queue is full, instead of rejecting them.
 
 """
 from __future__ import absolute_import
 
+import sys
+
 from docopt import docopt
 from pprint import PrettyPrinter
 from six.moves import configparser
 
 from misfit import __version__
-from misfit.auth import MisfitAuth
-from misfit.misfit import Misfit
 
 
 class MisfitCli:
@@ -51,6 +57,8 @@ class MisfitCli:
             self.client_id = arguments['--client_id']
             self.client_secret = arguments['--client_secret']
             self.authorize()
+        elif arguments['webhook']:
+            self.webhook(arguments)
         elif not arguments['--version'] and not arguments['--help']:
             try:
                 # Fail if config file doesn't exist or is missing information
@@ -92,6 +100,7 @@ class MisfitCli:
         end_date = arguments['--end_date']
         detail = arguments['--detail']
 
+        from misfit.misfit import Misfit
         misfit = Misfit(self.client_id, self.client_secret, self.access_token,
                         user_id)
 
@@ -121,6 +130,7 @@ class MisfitCli:
 
         # Thanks to the magic of docopts, I can be guaranteed to have a
         # a client_id and client_secret
+        from misfit.auth import MisfitAuth
         auth = MisfitAuth(self.client_id, self.client_secret)
         auth.browser_authorize()
 
@@ -130,6 +140,20 @@ class MisfitCli:
         else:
             print('ERROR: We were unable to authorize to use the Misfit API.')
 
+    def webhook(self, arguments):
+        """
+        Receive notifications until interrupted, printing each message as a
+        line of JSON
+        """
+        if sys.version_info < (3, 5):
+            print('ERROR: misfit webhook requires Python 3.5 or later.')
+            return
+        from misfit.webhook import main
+        main(arguments['--host'], int(arguments['--port']),
+             queue_size=int(arguments['--queue_size']),
+             concurrency=int(arguments['--concurrency']),
+             spill_path=arguments['--spill'])
+
 
 def main():
     """ Parse the arguments and use them to create a MisfitCli object """
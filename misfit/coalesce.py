@@ -0,0 +1,74 @@
+"""
+Coalescing of identical concurrent requests. When several threads ask a Misfit
+client with a :code:`MisfitCoalescer` for the same thing at once, only the
+first sends a request and the others wait for its result, so a burst of
+identical calls costs one request and one share of the rate limit: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.coalesce import MisfitCoalescer
+    >>> coalescer = MisfitCoalescer()
+    >>> clients = [Misfit(<client_id>, <client_secret>, token,
+    ...                   coalescer=coalescer) for token in tokens]
+
+Requests are identical when they have the same access token, URL, object id
+and parameters. The URL includes the API and user a client was made for. The
+callers share the decoded response, or the exception if it failed, and each
+builds its own objects from it. Unlike a cache, nothing is kept once the
+request is done.
+"""
+import six
+import sys
+import threading
+
+
+class _Flight(object):
+    """ A request in progress, and its result once it is done """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+        self.waiters = 0
+
+
+class MisfitCoalescer(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    @staticmethod
+    def key(access_token, url, object_id, params):
+        """ What makes requests identical """
+        return (access_token, url, object_id, tuple(sorted(params.items())))
+
+    def call(self, key, func, *args, **kwargs):
+        """
+        Call func, unless a call with the same key is already in progress, in
+        which case wait for it and return its result or raise its exception
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+        if not leader:
+            flight.done.wait()
+            if flight.exc_info is not None:
+                six.reraise(*flight.exc_info)
+            return flight.result
+        try:
+            flight.result = func(*args, **kwargs)
+        except Exception:
+            flight.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.result
+
+    def in_flight(self):
+        """ The number of requests in progress """
+        with self.lock:
+            return len(self.flights)
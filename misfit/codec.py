@@ -0,0 +1,75 @@
+"""
+The JSON codec behind API responses, notifications and caches. By default the
+fastest installed backend is used: `orjson <https://github.com/ijl/orjson>`_,
+then `ujson <https://github.com/ultrajson/ultrajson>`_, then the standard
+library's json. Choose one explicitly with :code:`set_backend`: ::
+
+    >>> from misfit import codec
+    >>> codec.set_backend('json')
+    'json'
+"""
+import json
+
+
+# Backends in order of preference
+BACKENDS = ('orjson', 'ujson', 'json')
+
+_backend = None
+
+
+def _load_backend(name):
+    """ The (name, loads, dumps) of a backend. Raises ImportError. """
+    if name == 'orjson':
+        import orjson
+        return name, orjson.loads, lambda obj: orjson.dumps(obj).decode('utf8')
+    if name == 'ujson':
+        import ujson
+        return name, ujson.loads, ujson.dumps
+    if name == 'json':
+        return name, _json_loads, json.dumps
+    raise ValueError('Unknown JSON backend: %s' % name)
+
+
+def _json_loads(data):
+    # The standard library only takes bytes from Python 3.6 on
+    if isinstance(data, bytes):
+        data = data.decode('utf8')
+    return json.loads(data)
+
+
+def set_backend(name=None):
+    """
+    Use the named backend, or the fastest one installed if ``name`` is None.
+    Returns the name of the backend in use.
+    """
+    global _backend
+    if name is not None:
+        _backend = _load_backend(name)
+        return name
+    for name in BACKENDS:
+        try:
+            _backend = _load_backend(name)
+        except ImportError:
+            continue
+        return name
+
+
+def backend():
+    """ The name of the backend in use """
+    if _backend is None:
+        set_backend()
+    return _backend[0]
+
+
+def loads(data):
+    """ Decode JSON text (or UTF-8 bytes) """
+    if _backend is None:
+        set_backend()
+    return _backend[1](data)
+
+
+def dumps(obj):
+    """ Encode obj as JSON text """
+    if _backend is None:
+        set_backend()
+    return _backend[2](obj)
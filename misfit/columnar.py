@@ -0,0 +1,86 @@
+"""
+Columnar results for analytics. Goals, detailed summaries, sessions and sleeps
+are decoded straight into `NumPy <http://www.numpy.org/>`_ arrays, one per
+field, without building a Misfit object per row: ::
+
+    >>> from misfit import Misfit
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>)
+    >>> sessions = misfit.columns('session', '2014-10-01', '2015-09-30')
+    >>> sessions['steps'].sum()
+    1406000.0
+
+Numbers are float64 with NaN for missing values, and ids and other strings
+are unicode. Dates are ``datetime64[D]``. Times are ``datetime64[s]`` in UTC,
+with the UTC offset the API gave them in seconds in an extra ``<name>Offset``
+column, so local days of sessions are
+``(startTime + startTimeOffset.astype('m8[s]')).astype('M8[D]')``.
+"""
+from collections import OrderedDict
+
+from .timestamps import utc_offset
+
+
+# The columns of each resource and their kind: 'date', 'time', 'number',
+# 'bool' or 'string'
+COLUMNS = {
+    'goal': [('id', 'string'), ('date', 'date'), ('points', 'number'),
+             ('targetPoints', 'number'), ('timeZoneOffset', 'number')],
+    'summary': [('date', 'date'), ('points', 'number'), ('steps', 'number'),
+                ('calories', 'number'), ('activityCalories', 'number'),
+                ('distance', 'number')],
+    'session': [('id', 'string'), ('activityType', 'string'),
+                ('startTime', 'time'), ('duration', 'number'),
+                ('points', 'number'), ('steps', 'number'),
+                ('calories', 'number'), ('distance', 'number')],
+    'sleep': [('id', 'string'), ('autoDetected', 'bool'),
+              ('startTime', 'time'), ('duration', 'number')]
+}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('Columnar results require NumPy: pip install numpy')
+    return numpy
+
+
+def time_columns(numpy, timestamps):
+    """ UTC datetime64[s] and UTC offset arrays of ISO 8601 timestamps """
+    offsets = numpy.array([utc_offset(t) for t in timestamps], dtype='i4')
+    local = numpy.array([t[:19] for t in timestamps], dtype='M8[s]')
+    return local - offsets.astype('m8[s]'), offsets
+
+
+def columns(resource, records, structured=False):
+    """
+    Decode the records of a resource ('goal', 'summary', 'session' or
+    'sleep') into a dict of column name to NumPy array, or a NumPy structured
+    array if ``structured`` is True
+    """
+    numpy = _numpy()
+    result = OrderedDict()
+    for name, kind in COLUMNS[resource]:
+        values = [record.get(name) for record in records]
+        if kind == 'number':
+            result[name] = numpy.array(
+                [numpy.nan if v is None else v for v in values], dtype='f8')
+        elif kind == 'bool':
+            result[name] = numpy.array([bool(v) for v in values], dtype='?')
+        elif kind == 'date':
+            result[name] = numpy.array(
+                ['NaT' if v is None else v[:10] for v in values],
+                dtype='M8[D]')
+        elif kind == 'time':
+            result[name], result['%sOffset' % name] = time_columns(
+                numpy, ['NaT' if v is None else v for v in values])
+        else:
+            result[name] = numpy.array(
+                ['' if v is None else v for v in values], dtype='U')
+    if not structured:
+        return result
+    array = numpy.empty(len(records), dtype=[
+        (str(name), column.dtype) for name, column in result.items()])
+    for name, column in result.items():
+        array[name] = column
+    return array
@@ -0,0 +1,157 @@
+"""
+Compact records for Misfit resources. They hold their fields in
+``__slots__`` instead of a dict, and drop the raw response unless asked to
+keep it, which takes roughly a third of the memory of the regular Misfit
+objects (run ``python -m benchmarks.memory`` for the numbers). Fields are
+read the same way: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.compact import compact_classes
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>,
+    ...                 object_classes=compact_classes())
+    >>> sessions = misfit.session(start_date='2014-10-01',
+    ...                           end_date='2015-09-30')
+    >>> sessions[0].startTime
+    <Arrow [2014-10-01T10:26:54-04:00]>
+
+Fields that aren't listed for a resource are dropped, unless the raw response
+is kept with ``keep_data=True``.
+"""
+import functools
+import six
+
+from . import codec
+from .misfit import (
+    TIMESTAMP_FIELDS,
+    GoalMixin,
+    MisfitDevice,
+    MisfitProfile,
+    UnicodeMixin
+)
+from .timestamps import convert
+
+
+def _timestamp_property(name):
+    """
+    A timestamp field is kept as the API's string until it is first read,
+    then converted to the class's timestamp_type and memoized
+    """
+    raw_name, value_name = '_%s' % name, '_%s_value' % name
+
+    def get_value(self):
+        try:
+            return getattr(self, value_name)
+        except AttributeError:
+            value = convert(getattr(self, raw_name), self.timestamp_type)
+            setattr(self, value_name, value)
+            return value
+
+    def set_value(self, value):
+        setattr(self, value_name, value)
+
+    return property(get_value, set_value)
+
+
+class CompactMeta(type):
+    """ Builds the __slots__ of a compact class from its ``fields`` """
+    def __new__(mcs, name, bases, attrs):
+        slots = []
+        for field in attrs.get('fields', ()):
+            if field in TIMESTAMP_FIELDS:
+                slots += ['_%s' % field, '_%s_value' % field]
+                attrs[field] = _timestamp_property(field)
+            else:
+                slots.append(field)
+        attrs.setdefault('__slots__', tuple(slots))
+        return super(CompactMeta, mcs).__new__(mcs, name, bases, attrs)
+
+
+class CompactObject(six.with_metaclass(CompactMeta, UnicodeMixin)):
+    __slots__ = ('_data',)
+    fields = ()
+    timestamp_type = 'arrow'
+
+    def __init__(self, data, keep_data=False):
+        self._data = data if keep_data else None
+        for name in self.fields:
+            if name in data:
+                self.set_value(name, data[name])
+
+    def set_value(self, name, value):
+        if name in TIMESTAMP_FIELDS:
+            setattr(self, '_%s' % name, value)
+        else:
+            setattr(self, name, value)
+
+    @property
+    def data(self):
+        """ The raw response if it was kept, or else rebuilt from fields """
+        if self._data is not None:
+            return self._data
+        data = {}
+        for name in self.fields:
+            slot = '_%s' % name if name in TIMESTAMP_FIELDS else name
+            if hasattr(self, slot):
+                data[name] = getattr(self, slot)
+        return data
+
+    def __unicode__(self):
+        return '%s: %s' % (type(self), codec.dumps(self.data))
+
+
+class CompactGoal(GoalMixin, CompactObject):
+    fields = ('id', 'date', 'points', 'targetPoints', 'timeZoneOffset')
+
+
+class CompactSummary(CompactObject):
+    fields = ('date', 'points', 'steps', 'calories', 'activityCalories',
+              'distance')
+
+
+class CompactSession(CompactObject):
+    fields = ('id', 'activityType', 'startTime', 'duration', 'points',
+              'steps', 'calories', 'distance')
+
+
+class CompactSleepDetail(CompactObject):
+    fields = ('datetime', 'value')
+
+
+class CompactSleep(CompactObject):
+    fields = ('id', 'autoDetected', 'startTime', 'duration', 'sleepDetails')
+
+    def __init__(self, data, keep_data=False):
+        super(CompactSleep, self).__init__(data, keep_data)
+        if 'sleepDetails' in data:
+            self.sleepDetails = tuple(
+                CompactSleepDetail(sleep_detail)
+                for sleep_detail in data['sleepDetails'])
+
+    @property
+    def data(self):
+        if self._data is not None:
+            return self._data
+        data = super(CompactSleep, self).data
+        if 'sleepDetails' in data:
+            data['sleepDetails'] = [sleep_detail.data
+                                    for sleep_detail in data['sleepDetails']]
+        return data
+
+
+def compact_classes(keep_data=False):
+    """
+    The ``object_classes`` for a Misfit client that builds compact records,
+    keeping the raw responses if ``keep_data`` is True. Profiles and devices
+    are few, so they stay regular Misfit objects.
+    """
+    classes = {
+        'goal': CompactGoal,
+        'summary': CompactSummary,
+        'session': CompactSession,
+        'sleep': CompactSleep
+    }
+    if keep_data:
+        classes = dict((name, functools.partial(cls, keep_data=True))
+                       for name, cls in classes.items())
+    classes.update(profile=MisfitProfile, device=MisfitDevice)
+    return classes
@@ -1,4 +1,4 @@
-import json
+from . import codec
 
 
 class MisfitException(Exception):
@@ -29,8 +29,17 @@ class MisfitHttpException(MisfitException):
     def build_exception(exc):
         code = exc.response.status_code if hasattr(exc, 'response') else 500
         message = exc.message if hasattr(exc, 'message') else 'Unknown error'
+        MisfitHttpException.build_from_content(
+            code, message, exc.content, getattr(exc, 'response', None))
+
+    @staticmethod
+    def build_from_content(code, message, content, response=None):
+        """
+        Raise the exception for an HTTP status code, preferring the code and
+        message in the JSON body of the response when there is one
+        """
         try:
-            json_content = json.loads(exc.content.decode('utf8'))
+            json_content = codec.loads(content.decode('utf8'))
         except ValueError:
             pass
         else:
@@ -54,7 +63,7 @@ class MisfitHttpException(MisfitException):
             500: MisfitUnknownError,
             502: MisfitBadGateway
         }
-        raise exceptions[code](code, message, getattr(exc, 'response', None))
+        raise exceptions[code](code, message, response)
 
 
 class MisfitNotFoundError(MisfitHttpException):
@@ -0,0 +1,143 @@
+"""
+Instrumentation of Misfit clients. Give a :code:`MisfitMetrics` to one or
+more Misfit instances and it will count their requests and time them, and
+pass an event for every request and every batch of objects built to its
+hooks, for instance to feed a metrics system: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.metrics import MisfitMetrics
+    >>> metrics = MisfitMetrics()
+    >>> metrics.add_hook(print)
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>,
+    ...                 metrics=metrics)
+    >>> sessions = misfit.session('2014-10-01', '2014-10-31')
+    RequestEvent(endpoint='activity/sessions', user='...', status=200,
+                 bytes=5188, connect=0.0412, ttfb=0.1824, total=0.1831,
+                 decode=0.0002, client=0.0009, wait=0.0)
+    ConstructEvent(endpoint='activity/sessions', user='...', objects=21,
+                   seconds=1.2e-05)
+    >>> metrics.counters['requests']
+    1
+    >>> metrics.histograms['ttfb'].quantile(0.95)
+    0.25
+
+All times are in seconds. For each request, ``connect`` is the time spent
+opening a connection (0 when one was reused), ``ttfb`` the time to the
+response headers, ``total`` the time until the body was read, ``decode`` the
+time decoding JSON, ``wait`` the time the rate limiter held the request back
+and ``client`` the rest of the time spent in the client, building the request
+and in slumber. Streamed requests have no ``bytes`` or
+``decode``, since their body is read as it is used.
+"""
+import bisect
+import threading
+
+from collections import namedtuple
+
+
+RequestEvent = namedtuple(
+    'RequestEvent',
+    'endpoint user status bytes connect ttfb total decode client wait')
+ConstructEvent = namedtuple('ConstructEvent', 'endpoint user objects seconds')
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+
+
+class Histogram(object):
+    """ Counts of values by bucket, with their count and sum """
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """ The upper bound of the bucket holding the q quantile """
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+
+    def as_dict(self):
+        return {'buckets': list(zip(self.buckets, self.counts)),
+                'count': self.count, 'sum': self.sum}
+
+
+class MisfitMetrics(object):
+    def __init__(self, buckets=BUCKETS):
+        """
+        - buckets: Upper bounds of the latency histogram buckets, in seconds
+        """
+        self.buckets = buckets
+        self.hooks = []
+        self.lock = threading.Lock()
+        self.reset()
+
+    def add_hook(self, hook):
+        """
+        Call hook with every RequestEvent and ConstructEvent. Hooks are
+        called on the thread that made the request, so they should be quick.
+        """
+        self.hooks.append(hook)
+
+    def reset(self):
+        """ Start counting from zero again """
+        with self.lock:
+            self.counters = {'requests': 0, 'errors': 0, 'bytes': 0,
+                             'objects': 0}
+            self.endpoints = {}
+            self.statuses = {}
+            self.histograms = dict(
+                (name, Histogram(self.buckets)) for name in
+                ['connect', 'ttfb', 'total', 'decode', 'client', 'wait',
+                 'construct'])
+
+    def request(self, event):
+        """ Count and time a request, and pass it to the hooks """
+        with self.lock:
+            self.counters['requests'] += 1
+            if event.status is None or event.status >= 400:
+                self.counters['errors'] += 1
+            self.counters['bytes'] += event.bytes or 0
+            self.endpoints[event.endpoint] = \
+                self.endpoints.get(event.endpoint, 0) + 1
+            self.statuses[event.status] = \
+                self.statuses.get(event.status, 0) + 1
+            for name in ['connect', 'ttfb', 'total', 'decode', 'client',
+                         'wait']:
+                value = getattr(event, name)
+                if value is not None:
+                    self.histograms[name].observe(value)
+        self._call_hooks(event)
+
+    def construct(self, event):
+        """ Count and time building objects, and pass it to the hooks """
+        with self.lock:
+            self.counters['objects'] += event.objects
+            self.histograms['construct'].observe(event.seconds)
+        self._call_hooks(event)
+
+    def snapshot(self):
+        """ A copy of the counters and histograms, as plain dicts and lists """
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'endpoints': dict(self.endpoints),
+                'statuses': dict(self.statuses),
+                'histograms': dict((name, histogram.as_dict()) for name,
+                                   histogram in self.histograms.items())
+            }
+
+    def _call_hooks(self, event):
+        for hook in self.hooks:
+            hook(event)
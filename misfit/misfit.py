@@ -1,101 +1,631 @@
-import arrow
-import json
+import array
+import hashlib
 import slumber
 import sys
+import threading
 
+from datetime import timedelta
+from timeit import default_timer
 from oauthlib.oauth2 import Client
 from requests_oauthlib import OAuth2
 from slumber.exceptions import HttpClientError, HttpServerError
+from slumber.serialize import JsonSerializer, Serializer
 
+from . import codec
+from .columnar import columns
 from .exceptions import MisfitException, MisfitHttpException
+from .metrics import ConstructEvent, RequestEvent
+from .streaming import iter_response_array
+from .timestamps import convert, epoch_seconds, parse_date
+from .transport import MisfitTransport, TransportSession, connect_time
+
+try:
+    from collections.abc import Sequence
+except ImportError:  # Python 2
+    from collections import Sequence
 
 API_URL = 'https://api.misfitwearables.com/'
 
 
-class Misfit:
-    def __init__(self, client_id, client_secret, access_token, user_id=None):
-        auth = OAuth2(client_id, Client(client_id),
-                      {'access_token': access_token})
-        user = user_id if user_id else 'me'
-        self.api = slumber.API('%smove/resource/v1/user/%s/' % (API_URL, user),
-                               auth=auth)
+# The longest date range the API will serve from a single request
+MAX_RANGE_DAYS = 31
+
+# The path, response key and extra query parameters of the resources that
+# can be fetched by date range
+RANGE_RESOURCES = {
+    'goal': ('activity/goals', 'goals', {}),
+    'summary': ('activity/summary', 'summary', {'detail': 'true'}),
+    'session': ('activity/sessions', 'sessions', {}),
+    'sleep': ('activity/sleeps', 'sleeps', {})
+}
+# Every resource path, for the URL templates of direct requests
+RESOURCE_PATHS = ['profile', 'device'] + sorted(
+    path for path, key, params in RANGE_RESOURCES.values())
+JSON_HEADERS = {'accept': 'application/json'}
+
+
+def record_date(record):
+    """ The local date of a date range record, as YYYY-MM-DD """
+    return (record.get('date') or record['startTime'])[:10]
+
+
+def pool_map(func, items, max_workers, processes=False, pool=None):
+    """
+    Call func on each item and return the results in order: on ``pool`` if
+    one is given, which is left open, otherwise on a new pool of at most
+    ``max_workers`` threads, or processes if ``processes`` is True, when
+    there is more than one item
+    """
+    if pool is not None:
+        return list(pool.map(func, items))
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    if processes:
+        from multiprocessing import Pool
+    else:
+        from multiprocessing.pool import ThreadPool as Pool
+    pool = Pool(min(max_workers, len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.terminate()
+
+
+class DateRangeMixin(object):
+    """
+    Request validation and date range windowing shared by the Misfit and
+    AsyncMisfit clients. Expects a ``max_range_days`` attribute.
+    """
+    def _check_date_range_or_id(self, start_date, end_date, object_id):
+        if (start_date is None or end_date is None) and object_id is None:
+            raise MisfitException(
+                'Either a date range or object id must be supplied')
+
+    def _date_windows(self, start_date, end_date):
+        """
+        Split the range from start_date to end_date (inclusive) into a list of
+        (start_date, end_date) windows no longer than max_range_days. Ranges
+        we can't make sense of are left alone for the API to reject.
+        """
+        start, end = parse_date(start_date), parse_date(end_date)
+        if start is None or end is None:
+            return [(start_date, end_date)]
+        if (end - start).days < self.max_range_days:
+            return [(start_date, end_date)]
+        windows = []
+        while start <= end:
+            window_end = min(
+                start + timedelta(days=self.max_range_days - 1), end)
+            windows.append((start.isoformat(), window_end.isoformat()))
+            start = window_end + timedelta(days=1)
+        return windows
+
+    @staticmethod
+    def _add_summaries(summaries):
+        """
+        Each non-detail summary is a total for its own window, so add them up
+        """
+        summary = {}
+        for window_summary in summaries:
+            for name, value in window_summary.items():
+                summary[name] = summary.get(name, 0) + value
+        return summary
+
+
+class Misfit(DateRangeMixin):
+    def __init__(self, client_id, client_secret, access_token, user_id=None,
+                 max_range_days=MAX_RANGE_DAYS, max_workers=4, transport=None,
+                 rate_limiter=None, retry=None, cache=None,
+                 object_classes=None, direct=False, range_cache=None,
+                 api_url=API_URL, metrics=None, coalescer=None):
+        """
+        Date ranges longer than ``max_range_days`` are split into windows
+        which are fetched concurrently on a pool of at most ``max_workers``
+        threads and merged back together in date order.
+
+        Requests are sent through ``transport``, a
+        :code:`misfit.transport.MisfitTransport` which may be shared with
+        other Misfit instances. Each instance gets its own by default.
+
+        When a :code:`misfit.ratelimit.MisfitRateLimiter` is given as
+        ``rate_limiter``, requests wait for their turn in its budget.
+
+        Failed requests are retried according to ``retry``, a
+        :code:`misfit.retry.MisfitRetry`, if given.
+
+        Responses are cached in ``cache``, a :code:`misfit.cache.MisfitCache`,
+        if given.
+
+        ``object_classes`` overrides the classes that responses are built
+        with, by method name. For example,
+        :code:`misfit.compact.compact_classes()` uses compact records.
+
+        Goals, detailed summaries, sessions and sleeps fetched by date range
+        are also cached a day at a time in ``range_cache``, another
+        :code:`misfit.cache.MisfitCache`, if given. A range that overlaps
+        days cached from earlier requests only fetches the days in between.
+
+        With ``direct`` set, requests go straight to the transport from URL
+        templates built here, skipping the resource objects, URL joining and
+        serializer lookups slumber does on every call.
+
+        ``api_url`` is where the API is, for a proxy or a test server.
+
+        Requests and the objects built from them are counted and timed in
+        ``metrics``, a :code:`misfit.metrics.MisfitMetrics` which may be
+        shared with other Misfit instances, if given.
 
-    def profile(self, object_id=None):
-        return MisfitProfile(self._get_object(self.api.profile, object_id))
+        Identical requests made at the same time by several threads share a
+        single request when ``coalescer``, a
+        :code:`misfit.coalesce.MisfitCoalescer` which may also be shared with
+        other Misfit instances, is given.
+        """
+        self.access_token = access_token
+        self.cache = cache
+        self.range_cache = range_cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.metrics = metrics
+        self.coalescer = coalescer
+        # The timings of the request in progress on each thread
+        self._local = threading.local()
+        self.auth = OAuth2(client_id, Client(client_id),
+                           {'access_token': access_token})
+        self.transport = transport if transport else MisfitTransport()
+        user = user_id if user_id else 'me'
+        # Who the responses belong to. 'me' depends on the access token, which
+        # shouldn't end up in a cache in the clear.
+        self.user_key = user_id if user_id else hashlib.sha256(
+            access_token.encode('utf8')).hexdigest()
+        self.base_url = '%smove/resource/v1/user/%s/' % (api_url, user)
+        self.api = slumber.API(
+            self.base_url, session=TransportSession(self._send),
+            serializer=Serializer('json', [CodecSerializer(self._decode)]))
+        self.direct = direct
+        # The URL of each resource path, and of an object on it
+        self.urls = dict((path, ('%s%s/' % (self.base_url, path),
+                                 '%s%s/%%s/' % (self.base_url, path)))
+                         for path in RESOURCE_PATHS)
+        self.max_range_days = max_range_days
+        self.max_workers = max_workers
+        self.object_classes = dict(OBJECT_CLASSES, **(object_classes or {}))
+
+    def profile(self, object_id=None, refresh=False):
+        """
+        The profile of the user, or of another one by id. With ``refresh``,
+        it is fetched from the API even if it is cached, and cached again.
+        """
+        return self._build_one('profile', 'profile', self._get_object(
+            'profile', object_id, refresh=refresh))
 
-    def device(self, object_id=None):
-        return MisfitDevice(self._get_object(self.api.device, object_id))
+    def device(self, object_id=None, refresh=False):
+        """ The device of the user, or another by id, like profile """
+        return self._build_one('device', 'device', self._get_object(
+            'device', object_id, refresh=refresh))
 
     def goal(self, start_date=None, end_date=None, object_id=None):
         self._check_date_range_or_id(start_date, end_date, object_id)
-        goals = self._get_object(
-            self.api.activity.goals, object_id,
-            start_date=start_date, end_date=end_date)
-        if 'goals' in goals:
-            return [MisfitGoal(goal) for goal in goals['goals']]
-        return MisfitGoal(goals)
+        if object_id is None:
+            return self._build('goal', 'activity/goals', self._get_range(
+                'activity/goals', 'goals', start_date, end_date))
+        return self._build_one('goal', 'activity/goals', self._get_object(
+            'activity/goals', object_id,
+            start_date=start_date, end_date=end_date))
 
     def summary(self, start_date, end_date, detail=False):
-        summary = self._get_object(
-            self.api.activity.summary, start_date=start_date,
-            end_date=end_date, detail='true' if detail else 'false')
-        if 'summary' in summary:
-            return [MisfitSummary(summ) for summ in summary['summary']]
-        return MisfitSummary(summary)
+        if detail:
+            return self._build('summary', 'activity/summary', self._get_range(
+                'activity/summary', 'summary', start_date, end_date,
+                detail='true'))
+        summaries = self._get_windows(
+            'activity/summary', start_date, end_date, detail='false')
+        if len(summaries) == 1 and 'summary' in summaries[0]:
+            return self._build('summary', 'activity/summary',
+                               summaries[0]['summary'])
+        return self._build_one('summary', 'activity/summary',
+                               self._add_summaries(summaries))
 
     def session(self, start_date=None, end_date=None, object_id=None):
         self._check_date_range_or_id(start_date, end_date, object_id)
-        sessions = self._get_object(
-            self.api.activity.sessions, object_id,
-            start_date=start_date, end_date=end_date)
-        if 'sessions' in sessions:
-            return [MisfitSession(session) for session in sessions['sessions']]
-        return MisfitSession(sessions)
+        if object_id is None:
+            return self._build('session', 'activity/sessions', self._get_range(
+                'activity/sessions', 'sessions', start_date, end_date))
+        return self._build_one(
+            'session', 'activity/sessions', self._get_object(
+                'activity/sessions', object_id,
+                start_date=start_date, end_date=end_date))
 
     def sleep(self, start_date=None, end_date=None, object_id=None):
         self._check_date_range_or_id(start_date, end_date, object_id)
-        sleeps = self._get_object(
-            self.api.activity.sleeps, object_id,
-            start_date=start_date, end_date=end_date)
-        if 'sleeps' in sleeps:
-            return [MisfitSleep(sleep) for sleep in sleeps['sleeps']]
-        return MisfitSleep(sleeps)
+        if object_id is None:
+            return self._build('sleep', 'activity/sleeps', self._get_range(
+                'activity/sleeps', 'sleeps', start_date, end_date))
+        return self._build_one('sleep', 'activity/sleeps', self._get_object(
+            'activity/sleeps', object_id,
+            start_date=start_date, end_date=end_date))
+
+    def objects(self, resource, object_ids, start_date=None, end_date=None,
+                refresh=False):
+        """
+        Fetch the goals, sessions or sleeps with the given ids, as a dict of
+        id to object. ``resource`` is 'goal', 'session' or 'sleep'. Given a
+        date range, they are looked for in it when that takes fewer requests
+        than fetching them by id, and those it doesn't turn up are fetched by
+        id. With ``refresh``, nothing is taken from the caches.
+        """
+        path, key, params = RANGE_RESOURCES[resource]
+        object_ids = sorted(set(object_ids))
+        records = {}
+        if start_date is not None and end_date is not None and len(
+                self._date_windows(start_date, end_date)) < len(object_ids):
+            wanted = set(object_ids)
+            for record in self._get_range(path, key, start_date, end_date,
+                                          refresh=refresh, **params):
+                if record.get('id') in wanted:
+                    records[record['id']] = record
+        for object_id in object_ids:
+            if object_id not in records:
+                records[object_id] = self._get_object(path, object_id,
+                                                      refresh=refresh)
+        return dict(zip(object_ids, self._build(
+            resource, path, [records[i] for i in object_ids])))
+
+    def records(self, resource, start_date, end_date, refresh=False):
+        """
+        Fetch the goals, detailed summaries, sessions or sleeps of a date
+        range as the dicts the API returns, without building Misfit objects.
+        ``resource`` is 'goal', 'summary', 'session' or 'sleep'. With
+        ``refresh``, everything is fetched from the API even if it is
+        cached, and cached again.
+        """
+        path, key, params = RANGE_RESOURCES[resource]
+        return self._get_range(path, key, start_date, end_date,
+                               refresh=refresh, **params)
 
-    def _check_date_range_or_id(self, start_date, end_date, object_id):
-        if (start_date is None or end_date is None) and object_id is None:
-            raise MisfitException(
-                'Either a date range or object id must be supplied')
+    def columns(self, resource, start_date, end_date, structured=False):
+        """
+        Fetch the goals, summary detail, sessions or sleeps of a date range
+        as NumPy arrays, without building Misfit objects. ``resource`` is
+        'goal', 'summary', 'session' or 'sleep'. Returns a dict of field name
+        to array, or a structured array if ``structured`` is True. See
+        :code:`misfit.columnar`.
+        """
+        path, key, params = RANGE_RESOURCES[resource]
+        records = self._get_range(path, key, start_date, end_date, **params)
+        return columns(resource, records, structured)
+
+    def iter_goals(self, start_date, end_date):
+        """
+        Yield the goals of a date range one at a time, decoding them as the
+        responses arrive so memory use doesn't grow with the range
+        """
+        return self._iter_range('goal', start_date, end_date)
+
+    def iter_summary(self, start_date, end_date):
+        """ Yield the daily summaries of a date range, like iter_goals """
+        return self._iter_range('summary', start_date, end_date)
+
+    def iter_sessions(self, start_date, end_date):
+        """ Yield the sessions of a date range, like iter_goals """
+        return self._iter_range('session', start_date, end_date)
+
+    def iter_sleeps(self, start_date, end_date):
+        """ Yield the sleeps of a date range, like iter_goals """
+        return self._iter_range('sleep', start_date, end_date)
+
+    def _build(self, resource, path, records):
+        """ Build an object of resource from each record fetched from path """
+        object_class = self.object_classes[resource]
+        if self.metrics is None:
+            return [object_class(record) for record in records]
+        start = default_timer()
+        objects = [object_class(record) for record in records]
+        self.metrics.construct(ConstructEvent(
+            path, self.user_key, len(objects), default_timer() - start))
+        return objects
+
+    def _build_one(self, resource, path, record):
+        return self._build(resource, path, [record])[0]
+
+    def _iter_range(self, resource, start_date, end_date):
+        """
+        Stream each window of a date range in turn, building an object for
+        each record as it is decoded
+        """
+        path, key, params = RANGE_RESOURCES[resource]
+        object_class = self.object_classes[resource]
+        for start, end in self._date_windows(start_date, end_date):
+            kwargs = dict(params, start_date=start, end_date=end)
+            if self.retry:
+                response = self.retry.call(self._open_stream, path, **kwargs)
+            else:
+                response = self._open_stream(path, **kwargs)
+            try:
+                for record in iter_response_array(response, key):
+                    yield object_class(record)
+            finally:
+                response.close()
+
+    def _open_stream(self, path, **kwargs):
+        """ Send a request for path, leaving the body to be streamed """
+        if self.metrics is not None:
+            # The body isn't read here, so there's nothing to decode
+            self._local.network, self._local.decode = None, None
+            self._local.wait = 0.0
+        start = default_timer()
+        try:
+            response = self._send('GET', self.urls[path][0], params=kwargs,
+                                  stream=True, headers=JSON_HEADERS)
+        finally:
+            if self.metrics is not None:
+                self._request_event(path, default_timer() - start)
+        if response.status_code >= 400:
+            MisfitHttpException.build_from_content(
+                response.status_code, 'Unknown error', response.content,
+                response)
+        return response
+
+    def _get_windows(self, path, start_date, end_date, refresh=False,
+                     **kwargs):
+        """
+        Fetch a date range one window at a time, using a thread pool when
+        there is more than one window. Returns the responses in date order.
+        """
+        return pool_map(lambda window: self._get_object(
+            path, start_date=window[0], end_date=window[1], refresh=refresh,
+            **kwargs), self._date_windows(start_date, end_date),
+            self.max_workers)
 
-    def _get_object(self, api_section, object_id=None, **kwargs):
+    def _get_range(self, path, key, start_date, end_date, refresh=False,
+                   **kwargs):
+        """
+        Fetch a date range and merge the ``key`` lists of every window. With
+        ``refresh``, cached responses are fetched again and replaced.
+        """
+        if self.range_cache is not None:
+            start, end = parse_date(start_date), parse_date(end_date)
+            if start is not None and end is not None:
+                return self._get_cached_range(path, key, start, end,
+                                              refresh=refresh, **kwargs)
+        return self._fetch_range(path, key, start_date, end_date,
+                                 refresh=refresh, **kwargs)
+
+    def _get_cached_range(self, path, key, start, end, refresh=False,
+                          **kwargs):
+        """
+        Fetch the days of a date range that aren't in the range cache, one
+        request per gap between cached days, and stitch them together with
+        the cached days in date order
+        """
+        cache = self.range_cache
+        days = [start + timedelta(days=i)
+                for i in range((end - start).days + 1)]
+        day_keys = [cache.key(self.user_key, path, day.isoformat(), kwargs)
+                    for day in days]
+        if refresh:
+            # Forget the old days first, so they aren't kept if this fails
+            for day_key in day_keys:
+                cache.delete(day_key)
+            day_records = [None] * len(days)
+        else:
+            day_records = [cache.get(day_key) for day_key in day_keys]
+        gaps = []
+        for day, records in zip(days, day_records):
+            if records is not None:
+                continue
+            if gaps and gaps[-1][1] + timedelta(days=1) == day:
+                gaps[-1] = (gaps[-1][0], day)
+            else:
+                gaps.append((day, day))
+        fetched = {}
+        for (gap_start, gap_end), records in zip(gaps, pool_map(
+                lambda gap: self._fetch_range(
+                    path, key, gap[0].isoformat(), gap[1].isoformat(),
+                    refresh=refresh, **kwargs), gaps, self.max_workers)):
+            for record in records:
+                # Keep records dated outside of their gap at its edges
+                date = min(max(record_date(record), gap_start.isoformat()),
+                           gap_end.isoformat())
+                fetched.setdefault(date, []).append(record)
+        records = []
+        for day, day_key, cached in zip(days, day_keys, day_records):
+            if cached is None:
+                cached = fetched.get(day.isoformat(), [])
+                cache.set(day_key, cached, cache.ttl_for(
+                    path, dict(kwargs, end_date=day.isoformat())))
+            records.extend(cached)
+        return records
+
+    def _fetch_range(self, path, key, start_date, end_date, refresh=False,
+                     **kwargs):
+        """ Fetch a date range from the API, one window at a time """
+        records = []
+        for response in self._get_windows(
+                path, start_date, end_date, refresh=refresh, **kwargs):
+            records.extend(response[key])
+        return records
+
+    def _send(self, method, url, **kwargs):
+        """ Send a request through the transport with our access token """
+        if self.rate_limiter:
+            start = default_timer()
+            self.rate_limiter.acquire(self.access_token)
+            if self.metrics is not None:
+                self._local.wait = default_timer() - start
+        start = default_timer()
+        response = self.transport.request(method, url, auth=self.auth,
+                                          **kwargs)
+        if self.metrics is not None:
+            # Not counting any wait for the rate limiter
+            self._local.network = (response, connect_time(),
+                                   default_timer() - start)
+        if self.rate_limiter:
+            self.rate_limiter.update(self.access_token, response.headers)
+        return response
+
+    def _get_object(self, path, object_id=None, refresh=False, **kwargs):
+        """
+        Fetch an object, from the cache if there is one, unless ``refresh``
+        """
+        if self.cache is None:
+            return self._fetch_shared(path, object_id, **kwargs)
+        key = self.cache.key(self.user_key, path, object_id, kwargs)
+        if refresh:
+            # Forget the old value first, so it isn't kept if this fails
+            self.cache.delete(key)
+            data = None
+        else:
+            data = self.cache.get(key)
+        if data is None:
+            data = self._fetch_shared(path, object_id, **kwargs)
+            self.cache.set(key, data, self.cache.ttl_for(path, kwargs))
+        return data
+
+    def _fetch_shared(self, path, object_id=None, **kwargs):
+        """ Fetch an object, joining an identical fetch in progress if any """
+        if self.coalescer is None:
+            return self._fetch_object(path, object_id, **kwargs)
+        key = self.coalescer.key(self.access_token, self.base_url + path,
+                                 object_id, kwargs)
+        return self.coalescer.call(
+            key, self._fetch_object, path, object_id, **kwargs)
+
+    def _fetch_object(self, path, object_id=None, **kwargs):
+        if self.retry:
+            return self.retry.call(
+                self._request_object, path, object_id, **kwargs)
+        return self._request_object(path, object_id, **kwargs)
+
+    def _request_object(self, path, object_id=None, **kwargs):
+        if self.metrics is None:
+            return self._request_api(path, object_id, **kwargs)
+        self._local.network, self._local.decode = None, 0.0
+        self._local.wait = 0.0
+        start = default_timer()
+        try:
+            return self._request_api(path, object_id, **kwargs)
+        finally:
+            self._request_event(path, default_timer() - start)
+
+    def _request_api(self, path, object_id=None, **kwargs):
+        if self.direct:
+            return self._request_direct(path, object_id, **kwargs)
+        api_section = self.api
+        for name in path.split('/'):
+            api_section = getattr(api_section, name)
         try:
             args = (object_id,) if object_id else tuple()
             return api_section(*args).get(**kwargs)
         except (HttpClientError, HttpServerError):
             MisfitHttpException.build_exception(sys.exc_info()[1])
 
+    def _request_direct(self, path, object_id=None, **kwargs):
+        """ Send a request from the URL templates, bypassing slumber """
+        url, object_url = self.urls[path]
+        response = self._send(
+            'GET', object_url % object_id if object_id else url,
+            params=kwargs, headers=JSON_HEADERS)
+        if response.status_code >= 400:
+            MisfitHttpException.build_from_content(
+                response.status_code, 'Unknown error', response.content,
+                response)
+        if not response.content:
+            return response.content
+        return self._decode(response.content)
+
+    def _decode(self, content):
+        """ Decode a JSON response, timing it when there are metrics """
+        if self.metrics is None:
+            return codec.loads(content)
+        start = default_timer()
+        try:
+            return codec.loads(content)
+        finally:
+            self._local.decode = getattr(self._local, 'decode', None) or 0.0
+            self._local.decode += default_timer() - start
+
+    def _request_event(self, path, seconds):
+        """
+        Pass the timings of the request just made on this thread, which took
+        ``seconds`` in all, to the metrics
+        """
+        network, decode = getattr(self._local, 'network', None), \
+            self._local.decode
+        # Waiting for the rate limiter isn't time spent in the client
+        wait = self._local.wait
+        seconds -= wait
+        self._local.network = None
+        if network is None:
+            # The request failed before there was a response
+            event = RequestEvent(path, self.user_key, None, None, None, None,
+                                 None, decode, seconds - (decode or 0.0),
+                                 wait)
+        else:
+            response, connect, total = network
+            elapsed = getattr(response, 'elapsed', None)
+            stream = decode is None
+            event = RequestEvent(
+                path, self.user_key, response.status_code,
+                None if stream else len(response.content or b''), connect,
+                elapsed.total_seconds() if elapsed is not None else None,
+                total, decode,
+                None if stream else max(seconds - total - decode, 0.0), wait)
+        self.metrics.request(event)
+
+
+class CodecSerializer(JsonSerializer):
+    """ Slumber's JSON serializer, using the misfit.codec backend """
+    def __init__(self, decode=codec.loads):
+        self.decode = decode
+
+    def loads(self, data):
+        return self.decode(data)
+
+    def dumps(self, data):
+        return codec.dumps(data)
+
 
 class UnicodeMixin(object):
+    __slots__ = ()
+
     if sys.version_info > (3, 0):
         __str__ = lambda x: x.__unicode__()
     else:
         __str__ = lambda x: unicode(x).encode('utf-8')
 
 
+# Fields that are converted to Arrow objects
+TIMESTAMP_FIELDS = frozenset(['date', 'datetime', 'startTime', 'Timestamp',
+                              'updatedAt', 'lastSyncTime'])
+
+
 class MisfitObject(UnicodeMixin):
+    # What timestamp fields are converted to: 'arrow', 'datetime' or 'epoch'.
+    # See misfit.timestamps.
+    timestamp_type = 'arrow'
+
     def __init__(self, data):
         self.data = data
-        for name, value in self.data.items():
-            self.set_value(name, value)
+
+    def __getattr__(self, name):
+        """
+        Each field of data becomes an attribute the first time it is read, so
+        objects only pay for converting the fields that are used
+        """
+        data = self.__dict__.get('data')
+        if data is None or name not in data:
+            raise AttributeError(name)
+        self.set_value(name, data[name])
+        return self.__dict__[name]
 
     def set_value(self, name, value):
-        if name in ['date', 'datetime', 'startTime', 'Timestamp', 'updatedAt',
-                    'lastSyncTime']:
-            setattr(self, name, arrow.get(value))
+        if name in TIMESTAMP_FIELDS:
+            setattr(self, name, convert(value, self.timestamp_type))
         else:
             setattr(self, name, value)
 
     def __unicode__(self):
-        return '%s: %s' % (type(self), json.dumps(self.data))
+        return '%s: %s' % (type(self), codec.dumps(self.data))
 
 
 class MisfitProfile(MisfitObject): pass
@@ -104,7 +634,9 @@ class MisfitProfile(MisfitObject): pass
 class MisfitDevice(MisfitObject): pass
 
 
-class MisfitGoal(MisfitObject):
+class GoalMixin(object):
+    __slots__ = ()
+
     def percent_complete(self):
         """
         Using the number of points received, and comparing to the target
@@ -116,6 +648,9 @@ class MisfitGoal(MisfitObject):
         return float(self.points) / self.targetPoints * 100
 
 
+class MisfitGoal(GoalMixin, MisfitObject): pass
+
+
 class MisfitSummary(MisfitObject): pass
 
 
@@ -125,10 +660,74 @@ class MisfitSession(MisfitObject): pass
 class MisfitSleepDetail(MisfitObject): pass
 
 
+class SleepDetails(Sequence):
+    """
+    The sleepDetails of a MisfitSleep. A MisfitSleepDetail is only built for
+    a detail when it is indexed or iterated over, and then kept.
+    """
+    def __init__(self, details):
+        self.details = details
+        self.objects = [None] * len(details)
+
+    def __len__(self):
+        return len(self.details)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        obj = self.objects[index]
+        if obj is None:
+            obj = self.objects[index] = MisfitSleepDetail(self.details[index])
+        return obj
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def arrays(self, start_time=None):
+        """
+        The details as two ``array.array('l')``: the seconds from
+        ``start_time`` (an ISO 8601 string, by default the first detail) to
+        each detail, and the sleep stage value of each detail. No
+        MisfitSleepDetail objects are built.
+        """
+        offsets, values = array.array('l'), array.array('l')
+        if not self.details:
+            return offsets, values
+        start = epoch_seconds(start_time or self.details[0]['datetime'])
+        for detail in self.details:
+            offsets.append(epoch_seconds(detail['datetime']) - start)
+            values.append(detail['value'])
+        return offsets, values
+
+
 class MisfitSleep(MisfitObject):
-    def __init__(self, data):
-        super(MisfitSleep, self).__init__(data)
-        sleep_details = []
-        for sleep_detail in self.sleepDetails:
-            sleep_details.append(MisfitSleepDetail(sleep_detail))
-        self.sleepDetails = sleep_details
+    def set_value(self, name, value):
+        if name == 'sleepDetails':
+            setattr(self, name, SleepDetails(value))
+        else:
+            super(MisfitSleep, self).set_value(name, value)
+
+    def detail_arrays(self):
+        """
+        The sleepDetails as (offsets, values) arrays, offsets being seconds
+        from the startTime of the sleep. See :code:`SleepDetails.arrays`.
+        """
+        details = self.sleepDetails if 'sleepDetails' in self.data else \
+            SleepDetails([])
+        return details.arrays(self.data.get('startTime'))
+
+
+# The classes each Misfit method builds its results with
+OBJECT_CLASSES = {
+    'profile': MisfitProfile,
+    'device': MisfitDevice,
+    'goal': MisfitGoal,
+    'summary': MisfitSummary,
+    'session': MisfitSession,
+    'sleep': MisfitSleep
+}
@@ -1,13 +1,22 @@
-import arrow
-import json
+import re
 import requests
+import threading
+import time
 
 from base64 import standard_b64decode
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+from collections import OrderedDict
+from six.moves.urllib.parse import urlparse
 
-from .misfit import MisfitObject
+from . import codec
+from .coalesce import MisfitCoalescer
+from .misfit import MisfitObject, pool_map
+
+
+# Seconds to wait for a SubscribeURL to answer
+CONFIRM_TIMEOUT = 10
+
+# Hosts that SNS signing certificates are trusted from, as regular expressions
+TRUSTED_HOSTS = (r'sns\.[a-z0-9-]+\.amazonaws\.com(\.cn)?',)
 
 
 def string_to_sign(data):
@@ -21,6 +30,83 @@ def string_to_sign(data):
     return '\n'.join(strings).encode('utf8')
 
 
+class MisfitCertificateCache(object):
+    """
+    The public keys of SNS signing certificates by URL, so a burst of
+    notifications signed with the same certificate fetches and parses it once.
+    A cache is shared by all threads of the process, and concurrent requests
+    for a certificate that isn't cached yet share one fetch.
+    """
+    def __init__(self, ttl=86400, maxsize=16, trusted_hosts=TRUSTED_HOSTS,
+                 timeout=10):
+        """
+        - ttl: Seconds to keep a public key before fetching its certificate
+          again
+        - maxsize: The most public keys to keep, evicting the least recently
+          used
+        - trusted_hosts: Regular expressions of the hosts certificates may be
+          fetched from, over HTTPS. Signatures made with certificates from
+          anywhere else are rejected without fetching them.
+        - timeout: Seconds to wait for a certificate
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.trusted_hosts = [re.compile('(?:%s)$' % host, re.IGNORECASE)
+                              for host in trusted_hosts]
+        self.timeout = timeout
+        self.keys = OrderedDict()
+        self.lock = threading.Lock()
+        self.coalescer = MisfitCoalescer()
+
+    def is_trusted(self, url):
+        """ Whether a signing certificate URL is on a trusted host """
+        parts = urlparse(url)
+        return parts.scheme == 'https' and any(
+            host.match(parts.hostname or '') for host in self.trusted_hosts)
+
+    def public_key(self, url):
+        """
+        The public key of the certificate at url, fetching it if it isn't
+        cached.
+
+        raises cryptography.exceptions.InvalidSignature if url isn't trusted
+        """
+        with self.lock:
+            entry = self.keys.pop(url, None)
+            if entry is not None and entry[0] >= time.time():
+                # Move the url to the most recently used end
+                self.keys[url] = entry
+                return entry[1]
+        if not self.is_trusted(url):
+            from cryptography.exceptions import InvalidSignature
+            raise InvalidSignature(
+                'Untrusted signing certificate URL: %s' % url)
+        return self.coalescer.call(url, self._fetch, url)
+
+    def clear(self):
+        """ Forget every public key """
+        with self.lock:
+            self.keys.clear()
+
+    def _fetch(self, url):
+        """ Fetch and parse a certificate, and cache its public key """
+        # cryptography is slow to import, and only needed here
+        from cryptography import x509
+        from cryptography.hazmat.backends import default_backend
+        cert_str = requests.get(url, timeout=self.timeout).content
+        cert = x509.load_pem_x509_certificate(cert_str, default_backend())
+        pubkey = cert.public_key()
+        with self.lock:
+            self.keys[url] = (time.time() + self.ttl, pubkey)
+            while len(self.keys) > self.maxsize:
+                self.keys.popitem(last=False)
+        return pubkey
+
+
+# The certificate cache notifications use unless given another
+CERTIFICATES = MisfitCertificateCache()
+
+
 class MisfitMessage(MisfitObject):
     """
     DELETED, CREATED and UPDATED are the three known actions you will find in
@@ -32,33 +118,144 @@ class MisfitMessage(MisfitObject):
 
 
 class MisfitNotification(MisfitObject):
-    def __init__(self, data):
-        """ Load the JSON to a dict and verify the signature if applicable """
-        data_dict = json.loads(data.decode('utf8'))
+    def __init__(self, data, certificates=None, verify=True, confirm=True):
+        """
+        Load the JSON to a dict and verify the signature if applicable, with
+        the public key of the signing certificate from ``certificates``, a
+        MisfitCertificateCache (the process-wide CERTIFICATES by default).
+        Pass ``verify=False`` when the signature has already been verified.
+
+        ``confirm`` is what to do with a subscription confirmation: True
+        confirms it right away, False leaves it to a later call to
+        :code:`confirm_subscription`, so parsing does no I/O, and an executor,
+        like a :code:`concurrent.futures.ThreadPoolExecutor`, confirms it in
+        the background, with the future of it in ``confirmation``.
+        """
+        self.certificates = CERTIFICATES if certificates is None else \
+            certificates
+        data_dict = codec.loads(data)
         super(MisfitNotification, self).__init__(data_dict)
-        if hasattr(self, 'Signature'):
+        if verify and hasattr(self, 'Signature'):
             self.verify_signature()
         if self.Type == 'Notification':
             # Objectify the message list
-            self.Message = [MisfitMessage(m) for m in json.loads(self.Message)]
+            self.Message = [MisfitMessage(m)
+                            for m in codec.loads(self.Message)]
         elif self.Type == 'SubscriptionConfirmation':
             # If the notification is a subscription confirmation, fetch the
             # subscribe URL
-            requests.get(self.SubscribeURL)
+            if hasattr(confirm, 'submit'):
+                self.confirmation = confirm.submit(self.confirm_subscription)
+            elif confirm:
+                self.confirm_subscription()
+
+    def confirm_subscription(self, timeout=CONFIRM_TIMEOUT, attempts=3,
+                             backoff=1):
+        """
+        Confirm a subscription by fetching its SubscribeURL, waiting up to
+        ``timeout`` seconds for each of up to ``attempts`` tries, and
+        ``backoff`` seconds, doubling each time, between them.
+
+        raises requests.RequestException if the last try fails
+        """
+        attempt = 1
+        while True:
+            try:
+                response = requests.get(self.SubscribeURL, timeout=timeout)
+                response.raise_for_status()
+                return response
+            except requests.RequestException:
+                if attempt >= attempts:
+                    raise
+            time.sleep(backoff * 2 ** (attempt - 1))
+            attempt += 1
 
     def verify_signature(self):
         """
         Verify the signature of the SNS message.
 
-        raises cryptography.exceptions.InvalidSignature
+        raises cryptography.exceptions.InvalidSignature, also when the signing
+        certificate isn't on a trusted host
         """
-        # Get the signing certificate and public key from the specified URL
-        cert_str = requests.get(self.data['SigningCertURL']).content
-        cert = default_backend().load_pem_x509_certificate(cert_str)
-        pubkey = cert.public_key()
-        # Verify the signature
-        signature = standard_b64decode(self.data['Signature'].encode('utf8'))
-        verifier = pubkey.verifier(signature, PKCS1v15(), hashes.SHA1())
-        verifier.update(string_to_sign(self.data))
-        # verify returns None on success, raises InvalidSignature on failure
-        assert verifier.verify() is None
+        verify_data(self.data, self.certificates)
+
+
+def verify_data(data, certificates=CERTIFICATES):
+    """
+    Verify the signature of a decoded SNS message.
+
+    raises cryptography.exceptions.InvalidSignature
+    """
+    # cryptography is slow to import, and only needed here
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+    # Get the public key of the signing certificate at the specified URL
+    pubkey = certificates.public_key(data['SigningCertURL'])
+    # Verify the signature
+    signature = standard_b64decode(data['Signature'].encode('utf8'))
+    # verify returns None on success, raises InvalidSignature on failure
+    pubkey.verify(signature, string_to_sign(data), PKCS1v15(), hashes.SHA1())
+
+
+def verify_notifications(bodies, max_workers=4, processes=False,
+                         certificates=None, pool=None, confirm=False):
+    """
+    Parse and verify many raw notification bodies at once, on a pool of at
+    most ``max_workers`` threads, or processes if ``processes`` is True. A
+    body that fails doesn't stop the others. Returns a list of the
+    MisfitNotifications of the bodies that passed, in order, and a list of
+    (index, exception) of those that didn't.
+
+    Threads share ``certificates``, and work in parallel while fetching
+    certificates and, with most cryptography backends, verifying signatures.
+    Processes verify each signature with their own CERTIFICATES and return
+    the ones that passed to be parsed again without verifying, so they can't
+    be given ``certificates``.
+
+    A pool is started and shut down for every call, unless ``pool`` is
+    given: a thread or process pool, by ``processes``, with a map method,
+    like a :code:`multiprocessing.Pool` or a
+    :code:`concurrent.futures.Executor`, that is left open for the next call.
+
+    Subscription confirmations are passed ``confirm``, as in
+    :code:`MisfitNotification`. By default they aren't confirmed, so
+    verifying a batch does no subscription I/O.
+    """
+    if processes and certificates is not None:
+        raise ValueError('Worker processes verify with their own '
+                         'CERTIFICATES, not the certificates given')
+    bodies = list(bodies)
+    if processes:
+        errors = pool_map(_verify_body, bodies, max_workers, processes, pool)
+        results = [_parse_body((body, None, False, confirm)) if error is None
+                   else (None, error) for body, error in zip(bodies, errors)]
+    else:
+        results = pool_map(_parse_body, [(body, certificates, True, confirm)
+                                         for body in bodies], max_workers,
+                           pool=pool)
+    notifications, failures = [], []
+    for index, (notification, error) in enumerate(results):
+        if error is None:
+            notifications.append(notification)
+        else:
+            failures.append((index, error))
+    return notifications, failures
+
+
+def _parse_body(args):
+    """ (MisfitNotification, None) from a body, or (None, exception) """
+    body, certificates, verify, confirm = args
+    try:
+        return MisfitNotification(body, certificates, verify, confirm), None
+    except Exception as exc:
+        return None, exc
+
+
+def _verify_body(body):
+    """ The exception verifying a body raised, or None if it passed """
+    try:
+        data = codec.loads(body)
+        if 'Signature' in data:
+            verify_data(data)
+    except Exception as exc:
+        return exc
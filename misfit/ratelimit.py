@@ -0,0 +1,157 @@
+"""
+Client-side rate limiting for the Misfit API. A :code:`MisfitRateLimiter`
+reads the ``x-ratelimit-*`` headers of every response and paces the requests
+of each access token so its remaining budget lasts until the reset time,
+making callers wait briefly rather than get a :code:`MisfitRateLimitError`.
+An optional app-wide limit paces all tokens together. Share one limiter
+between all the Misfit instances of an app: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.ratelimit import MisfitRateLimiter
+    >>> limiter = MisfitRateLimiter(app_limit=5000, app_period=3600)
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>,
+    ...                 rate_limiter=limiter)
+    >>> limiter.budget(<access_token>)
+    RateLimitBudget(limit=150, remaining=148, reset=1418424178.0)
+"""
+import threading
+import time
+
+from collections import namedtuple
+
+from .exceptions import MisfitRateLimitError
+
+
+RateLimitBudget = namedtuple('RateLimitBudget', 'limit remaining reset')
+
+
+class TokenBucket(object):
+    """
+    Allows bursts of up to ``capacity`` requests, refilled at ``rate``
+    requests per second. When the API reports the budget, the bucket is
+    capped at the remaining requests and refilled just fast enough to spend
+    them by the reset time.
+    """
+    def __init__(self, capacity, rate=None):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.rate = rate
+        self.limit = None
+        self.remaining = None
+        self.reset = None
+        self.updated = time.time()
+
+    def refill(self, now):
+        if self.reset is not None and now >= self.reset:
+            # A new rate limit window has started
+            self.remaining = self.limit
+            self.reset = None
+            self.rate = None
+            self.tokens = float(self.capacity)
+        elif self.rate:
+            self.tokens += self.rate * (now - self.updated)
+        else:
+            # Nothing to pace by until the API tells us the budget
+            self.tokens = float(self.capacity)
+        self.tokens = min(self.tokens, self.capacity)
+        if self.remaining is not None:
+            self.tokens = min(self.tokens, self.remaining)
+        self.updated = now
+
+    def wait_time(self, now):
+        """ Seconds until a request can be sent """
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0
+        if self.reset is not None and (not self.rate or self.remaining < 1):
+            return self.reset - now
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+        if self.remaining is not None:
+            self.remaining -= 1
+
+    def update(self, limit, remaining, reset, now):
+        self.refill(now)
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.rate = float(remaining) / max(reset - now, 1)
+        self.tokens = min(self.tokens, remaining)
+
+    def budget(self):
+        return RateLimitBudget(self.limit, self.remaining, self.reset)
+
+
+class MisfitRateLimiter(object):
+    def __init__(self, burst=10, app_limit=None, app_period=3600,
+                 max_wait=None):
+        """
+        - burst: The most requests each access token may send back to back
+        - app_limit: The most requests all access tokens together may send
+          every ``app_period`` seconds, or None for no app-wide limit
+        - max_wait: The longest acquire may block, in seconds. When a request
+          would have to wait longer, MisfitRateLimitError is raised instead.
+        """
+        self.burst = burst
+        self.max_wait = max_wait
+        self.app_bucket = None
+        if app_limit:
+            self.app_bucket = TokenBucket(
+                app_limit, float(app_limit) / app_period)
+            self.app_bucket.limit = app_limit
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, key):
+        if key not in self.buckets:
+            self.buckets[key] = TokenBucket(self.burst)
+        return self.buckets[key]
+
+    def acquire(self, key):
+        """ Block until the access token ``key`` may send a request """
+        while True:
+            with self.lock:
+                now = time.time()
+                buckets = [self._bucket(key)]
+                if self.app_bucket:
+                    buckets.append(self.app_bucket)
+                wait = max(bucket.wait_time(now) for bucket in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    return
+            if self.max_wait is not None and wait > self.max_wait:
+                raise MisfitRateLimitError(
+                    429, 'Rate limit budget exhausted for %d seconds' % wait)
+            time.sleep(wait)
+
+    def update(self, key, headers):
+        """
+        Update the budget of the access token ``key`` from the rate limit
+        headers of a response
+        """
+        try:
+            limit = int(headers['x-ratelimit-limit'])
+            remaining = int(headers['x-ratelimit-remaining'])
+            reset = float(headers['x-ratelimit-reset'])
+        except (KeyError, ValueError):
+            return
+        with self.lock:
+            self._bucket(key).update(limit, remaining, reset, time.time())
+
+    def budget(self, key=None):
+        """
+        The budget of the access token ``key``, as last reported by the API
+        and counted down since, or the app-wide budget when no key is given.
+        Unknown values are None.
+        """
+        with self.lock:
+            if key is None:
+                if self.app_bucket is None:
+                    return RateLimitBudget(None, None, None)
+                self.app_bucket.refill(time.time())
+                return RateLimitBudget(self.app_bucket.limit,
+                                       int(self.app_bucket.tokens), None)
+            return self._bucket(key).budget()
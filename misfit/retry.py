@@ -0,0 +1,97 @@
+"""
+Retrying failed requests to the Misfit API. Give a :code:`MisfitRetry` to a
+Misfit client to retry transient errors with exponential backoff: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.retry import MisfitRetry
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>,
+    ...                 retry=MisfitRetry(max_attempts=5))
+"""
+import random
+import sys
+import time
+
+from email.utils import mktime_tz, parsedate_tz
+
+from .exceptions import (
+    MisfitBadGateway,
+    MisfitRateLimitError,
+    MisfitUnknownError
+)
+
+
+class MisfitRetry(object):
+    def __init__(self, max_attempts=3, backoff_factor=0.5, max_backoff=30,
+                 jitter=0.5, max_retry_after=60,
+                 retry_on=(MisfitBadGateway, MisfitRateLimitError,
+                           MisfitUnknownError)):
+        """
+        - max_attempts: How many times to try a request, including the first
+        - backoff_factor: Seconds to wait after the first attempt fails. The
+          wait doubles after each further attempt, up to ``max_backoff``
+        - jitter: The fraction of each wait that is randomized, from 0 (none)
+          to 1 (anywhere between no wait and the full wait)
+        - max_retry_after: The longest to wait for a rate limit to reset, as
+          given by the Retry-After or x-ratelimit-reset headers. Rate limit
+          errors that would take longer to reset are not retried.
+        - retry_on: The exception classes to retry
+        """
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+        self.retry_on = retry_on
+
+    def call(self, func, *args, **kwargs):
+        """ Call func, retrying it until it succeeds or we give up """
+        attempt = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except self.retry_on:
+                delay = self.delay(attempt, sys.exc_info()[1])
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def delay(self, attempt, exc):
+        """
+        Seconds to wait before retrying after attempt number ``attempt``
+        failed with ``exc``, or None to give up
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if isinstance(exc, MisfitRateLimitError):
+            retry_after = self.retry_after(exc)
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                return max(retry_after, 0)
+        backoff = min(self.backoff_factor * 2 ** (attempt - 1),
+                      self.max_backoff)
+        return backoff - random.uniform(0, backoff * self.jitter)
+
+    def retry_after(self, exc):
+        """
+        Seconds until the rate limit resets according to the response
+        headers, or None if they don't say
+        """
+        headers = getattr(getattr(exc, 'response', None), 'headers', None)
+        if not headers:
+            return None
+        if 'retry-after' in headers:
+            try:
+                return float(headers['retry-after'])
+            except ValueError:
+                # Retry-After may also be an HTTP date
+                reset = parsedate_tz(headers['retry-after'])
+                if reset is not None:
+                    return mktime_tz(reset) - time.time()
+        if 'x-ratelimit-reset' in headers:
+            try:
+                return float(headers['x-ratelimit-reset']) - time.time()
+            except ValueError:
+                pass
+        return None
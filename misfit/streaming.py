@@ -0,0 +1,116 @@
+"""
+Incremental decoding of large API responses. The records of a response like
+``{"sessions": [{...}, {...}, ...]}`` are decoded one at a time as the
+response arrives, so memory use depends on the size of one record, not of the
+whole response.
+"""
+import codecs
+import json
+import re
+
+
+# Bytes to read from the response at a time
+CHUNK_SIZE = 64 * 1024
+
+_structure = re.compile(r'[][{}",:]')
+# Inside an element, only strings and nesting matter
+_nesting = re.compile(r'[][{}"]')
+_string_end = re.compile(r'["\\]')
+_not_space = re.compile(r'\S')
+
+
+def iter_json_array(chunks, key, decoder=json.JSONDecoder()):
+    """
+    Yield the elements of the array under ``key`` in the JSON object made up
+    of the text ``chunks``. Yields nothing if the object has no such key.
+
+    The text is scanned once, keeping track of strings and nesting across
+    chunks, so only a key of the top level object matches and each element
+    is decoded once, as soon as its end has arrived.
+    """
+    buf, pos = '', 0
+    depth = 0  # Nesting depth at pos. Elements of the array are at depth 2.
+    in_string = False
+    string_start = 0
+    last_string = None  # The last string at depth 1, which may be a key
+    expect_array = False  # The key was found, so its value comes next
+    element_start = None  # Where the current element began, once in the array
+    for chunk in chunks:
+        buf += chunk
+        while True:
+            if in_string:
+                match = _string_end.search(buf, pos)
+                if match is None:
+                    pos = len(buf)
+                    break
+                if match.group() == '\\':
+                    if match.end() == len(buf):
+                        # The escaped character is in the next chunk
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                in_string, pos = False, match.end()
+                if depth == 1:
+                    last_string = buf[string_start:pos]
+                elif depth == 2 and element_start is not None:
+                    # A string element
+                    yield decoder.decode(buf[element_start:pos])
+                    element_start = pos
+                continue
+            if expect_array:
+                match = _not_space.search(buf, pos)
+                if match is None:
+                    pos = len(buf)
+                    break
+                if match.group() != '[':
+                    return
+                expect_array, depth = False, 2
+                pos = element_start = match.end()
+                continue
+            match = (_nesting if depth > 2 else _structure).search(buf, pos)
+            if match is None:
+                pos = len(buf)
+                break
+            char, pos = match.group(), match.end()
+            if char == '"':
+                in_string, string_start = True, match.start()
+                continue
+            if element_start is not None and depth == 2 and char in ',]':
+                text = buf[element_start:match.start()]
+                if text.strip():
+                    yield decoder.decode(text)
+                if char == ']':
+                    return
+                element_start = pos
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 2 and element_start is not None:
+                    # An object or array element
+                    yield decoder.decode(buf[element_start:pos])
+                    element_start = pos
+            elif char == ':' and depth == 1 and last_string is not None and \
+                    json.loads(last_string) == key:
+                expect_array = True
+            last_string = None
+        # Let go of the text that has been dealt with
+        keep = element_start if element_start is not None else \
+            string_start if in_string else pos
+        if keep:
+            buf, pos = buf[keep:], pos - keep
+            string_start -= keep
+            if element_start is not None:
+                element_start -= keep
+    if element_start is not None or expect_array:
+        raise ValueError('Truncated JSON array "%s"' % key)
+
+
+def iter_response_array(response, key):
+    """
+    Yield the elements of the array under ``key`` in the JSON body of a
+    streamed :code:`requests.models.Response`
+    """
+    return iter_json_array(codecs.iterdecode(
+        response.iter_content(CHUNK_SIZE), response.encoding or 'utf-8'), key)
@@ -0,0 +1,200 @@
+"""
+Incremental sync of Misfit data into a local SQLite database. Each sync only
+asks the API for the days since the last one, plus any days marked as changed,
+so polling costs depend on how much is new rather than on how much history a
+user has: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.sync import MisfitSync
+    >>> sync = MisfitSync('misfit.db', start_date='2014-01-01')
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>)
+    >>> sync.sync(misfit)
+    {'session': 420, 'sleep': 380, 'summary': 655}
+    >>> sync.sync(misfit)
+    {'session': 1, 'sleep': 1, 'summary': 1}
+    >>> sessions = sync.records(misfit.user_key, 'session')
+
+Records are stored by user, resource and object id (date for summaries), so
+fetching a day again updates its records instead of duplicating them. When
+a notification says something changed, :code:`changed` queues its day for
+the next sync.
+"""
+import arrow
+import sqlite3
+import threading
+
+from datetime import timedelta
+
+from . import codec
+from .misfit import record_date
+
+
+# The resources synced by default
+SYNC_RESOURCES = ('session', 'sleep', 'summary')
+
+
+def record_id(resource, record):
+    """ The key of a record: its id, or its date for summaries """
+    return record['date'] if resource == 'summary' else record['id']
+
+
+class MisfitSync(object):
+    def __init__(self, path, start_date, refetch_days=1):
+        """
+        - path: The SQLite database to keep records and sync state in
+        - start_date: The first day to fetch for a user that has never been
+          synced
+        - refetch_days: Days at the end of the last sync to fetch again,
+          since they may not have been over yet
+        """
+        self.start_date = arrow.get(start_date).date()
+        self.refetch_days = refetch_days
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS misfit_sync_mark ('
+                'user TEXT, resource TEXT, synced_date TEXT, '
+                'PRIMARY KEY (user, resource))')
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS misfit_sync_changed ('
+                'user TEXT, resource TEXT, date TEXT, '
+                'PRIMARY KEY (user, resource, date))')
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS misfit_sync_record ('
+                'user TEXT, resource TEXT, id TEXT, date TEXT, data TEXT, '
+                'PRIMARY KEY (user, resource, id))')
+            self.db.execute(
+                'CREATE INDEX IF NOT EXISTS misfit_sync_record_date '
+                'ON misfit_sync_record (user, resource, date)')
+
+    def mark(self, user, resource):
+        """ The last day synced of a user's resource, or None """
+        with self.lock:
+            row = self.db.execute(
+                'SELECT synced_date FROM misfit_sync_mark '
+                'WHERE user = ? AND resource = ?', (user, resource)).fetchone()
+        return row[0] if row else None
+
+    def changed(self, user, resource, date):
+        """
+        Queue a day of a user's resource to be fetched again by the next sync,
+        unless that sync would fetch it anyway
+        """
+        date = arrow.get(date).date()
+        synced_date = self.mark(user, resource)
+        with self.lock, self.db:
+            if synced_date and date < self._next_date(synced_date):
+                self.db.execute(
+                    'INSERT OR IGNORE INTO misfit_sync_changed '
+                    'VALUES (?, ?, ?)', (user, resource, date.isoformat()))
+
+    def sync(self, misfit, resources=SYNC_RESOURCES, end_date=None):
+        """
+        Fetch what is new or changed of each resource for the user of a
+        :code:`misfit.Misfit` client, up to ``end_date`` (today in UTC by
+        default). Returns a dict of resource to the number of records stored.
+        """
+        end = arrow.get(end_date).date() if end_date else \
+            arrow.utcnow().date()
+        return dict((resource, self.sync_resource(misfit, resource, end))
+                    for resource in resources)
+
+    def sync_resource(self, misfit, resource, end):
+        """ Fetch the new and changed days of one resource up to end """
+        user = misfit.user_key
+        synced_date = self.mark(user, resource)
+        start = self._next_date(synced_date) if synced_date else \
+            self.start_date
+        # Windows of changed days, then the new days if there are any
+        windows = [window + (None,) for window in
+                   self._changed_windows(user, resource, start)]
+        if start <= end:
+            windows.append((start, end, end))
+        count = 0
+        for window_start, window_end, new_synced_date in windows:
+            records = self._fetch(misfit, resource, window_start, window_end)
+            self._store(user, resource, records, window_start, window_end)
+            count += len(records)
+            if new_synced_date is not None:
+                self._set_mark(user, resource, new_synced_date)
+        return count
+
+    def records(self, user, resource, start_date=None, end_date=None):
+        """
+        The stored records of a user's resource in date order, optionally
+        limited to a date range
+        """
+        query = ('SELECT data FROM misfit_sync_record '
+                 'WHERE user = ? AND resource = ?')
+        params = [user, resource]
+        if start_date:
+            query += ' AND date >= ?'
+            params.append(arrow.get(start_date).date().isoformat())
+        if end_date:
+            query += ' AND date <= ?'
+            params.append(arrow.get(end_date).date().isoformat())
+        with self.lock:
+            rows = self.db.execute(query + ' ORDER BY date, id',
+                                   params).fetchall()
+        return [codec.loads(row[0]) for row in rows]
+
+    def delete(self, user, resource, object_id):
+        """ Forget a record, for instance when the API says it was deleted """
+        with self.lock, self.db:
+            self.db.execute(
+                'DELETE FROM misfit_sync_record '
+                'WHERE user = ? AND resource = ? AND id = ?',
+                (user, resource, object_id))
+
+    def close(self):
+        self.db.close()
+
+    def _next_date(self, synced_date):
+        """ The first day a sync after synced_date starts from """
+        return arrow.get(synced_date).date() + timedelta(
+            days=1 - self.refetch_days)
+
+    def _changed_windows(self, user, resource, start):
+        """
+        The queued changed days before start, as (start, end) windows of
+        consecutive days
+        """
+        with self.lock:
+            dates = [arrow.get(row[0]).date() for row in self.db.execute(
+                'SELECT date FROM misfit_sync_changed '
+                'WHERE user = ? AND resource = ? AND date < ? ORDER BY date',
+                (user, resource, start.isoformat()))]
+        windows = []
+        for date in dates:
+            if windows and windows[-1][1] + timedelta(days=1) == date:
+                windows[-1] = (windows[-1][0], date)
+            else:
+                windows.append((date, date))
+        return windows
+
+    def _fetch(self, misfit, resource, start, end):
+        """ Fetch a window from the API, not from the client's caches """
+        return misfit.records(resource, start.isoformat(), end.isoformat(),
+                              refresh=True)
+
+    def _store(self, user, resource, records, start, end):
+        """ Upsert the records of a window and clear its changed days """
+        with self.lock, self.db:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO misfit_sync_record '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(user, resource, record_id(resource, record),
+                  record_date(record), codec.dumps(record))
+                 for record in records])
+            self.db.execute(
+                'DELETE FROM misfit_sync_changed WHERE user = ? AND '
+                'resource = ? AND date >= ? AND date <= ?',
+                (user, resource, start.isoformat(), end.isoformat()))
+
+    def _set_mark(self, user, resource, synced_date):
+        """ Set the last day synced of a user's resource """
+        with self.lock, self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO misfit_sync_mark VALUES (?, ?, ?)',
+                (user, resource, synced_date.isoformat()))
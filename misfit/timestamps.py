@@ -0,0 +1,126 @@
+"""
+Conversion of the API's timestamps. The formats the API returns, dates like
+``2014-10-05`` and times like ``2014-10-05T10:26:54-04:00``, are parsed
+directly instead of through :code:`arrow.get`. The same dates come back in
+many records, so recent conversions are remembered too.
+
+Misfit objects convert their timestamp fields to Arrow objects by default.
+Subclasses can ask for timezone-aware datetimes or epoch seconds instead by
+setting ``timestamp_type``: ::
+
+    >>> from misfit import Misfit, MisfitSession
+    >>> class Session(MisfitSession):
+    ...     timestamp_type = 'epoch'
+    >>> misfit = Misfit(<client_id>, <client_secret>, <access_token>,
+    ...                 object_classes={'session': Session})
+    >>> misfit.session('2014-10-05', '2014-10-05')[0].startTime
+    1412519214.0
+"""
+import re
+import six
+
+from calendar import timegm
+from datetime import datetime
+
+
+# The timestamp types convert can return
+TIMESTAMP_TYPES = ('arrow', 'datetime', 'epoch')
+
+# The most conversions of each type to remember
+MEMO_SIZE = 4096
+
+_memos = dict((timestamp_type, {}) for timestamp_type in TIMESTAMP_TYPES)
+_tzinfos = {}
+_iso = re.compile(
+    r'(\d{4})-(\d\d)-(\d\d)'
+    r'(?:T(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6})\d*)?(Z|[+-]\d\d:?\d\d)?)?$')
+
+
+def utc_offset(timestamp):
+    """
+    Seconds east of UTC of an ISO 8601 timestamp like the API's
+    2014-10-05T10:26:54-04:00
+    """
+    tail = timestamp[19:].lstrip('.0123456789')
+    if not tail or tail == 'Z':
+        return 0
+    sign = -1 if tail[0] == '-' else 1
+    hours, minutes = tail[1:3], tail[-2:] if len(tail) > 3 else '0'
+    return sign * (int(hours) * 3600 + int(minutes) * 60)
+
+
+def epoch_seconds(timestamp):
+    """
+    Whole seconds since the epoch of an ISO 8601 timestamp like the API's
+    2014-10-05T10:26:54-04:00, without building a datetime or Arrow object
+    """
+    return timegm((int(timestamp[0:4]), int(timestamp[5:7]),
+                   int(timestamp[8:10]), int(timestamp[11:13]),
+                   int(timestamp[14:16]), int(timestamp[17:19]))) - \
+        utc_offset(timestamp)
+
+
+def _tzinfo(offset):
+    tzinfo = _tzinfos.get(offset)
+    if tzinfo is None:
+        from dateutil import tz
+        tzinfo = tz.tzutc() if offset == 0 else tz.tzoffset(None, offset)
+        _tzinfos[offset] = tzinfo
+    return tzinfo
+
+
+def _parse(value, timestamp_type):
+    match = _iso.match(value) if isinstance(value, six.string_types) else None
+    if match is None:
+        # Not a format the API returns, so let arrow make sense of it
+        import arrow
+        value = arrow.get(value)
+        if timestamp_type == 'datetime':
+            return value.datetime
+        if timestamp_type == 'epoch':
+            return value.float_timestamp
+        return value
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+    fields = (int(year), int(month), int(day), int(hour or 0),
+              int(minute or 0), int(second or 0),
+              int(fraction.ljust(6, '0')) if fraction else 0)
+    offset = utc_offset(value) if zone else 0
+    if timestamp_type == 'epoch':
+        return float(timegm(fields[:6]) - offset) + fields[6] / 1e6
+    if timestamp_type == 'datetime':
+        return datetime(*fields, tzinfo=_tzinfo(offset))
+    import arrow
+    return arrow.Arrow(*fields, tzinfo=_tzinfo(offset))
+
+
+def parse_date(value):
+    """
+    The date of a date range parameter like '2014-10-05', or None if it
+    can't be made sense of
+    """
+    try:
+        return convert(value, 'datetime').date()
+    except (RuntimeError, TypeError, ValueError):
+        # Older versions of arrow raise a ParserError that is a RuntimeError
+        return None
+
+
+def convert(value, timestamp_type='arrow'):
+    """
+    Convert a timestamp from the API to an Arrow object, a timezone-aware
+    datetime or float seconds since the epoch, by ``timestamp_type``
+    ('arrow', 'datetime' or 'epoch')
+    """
+    memo = _memos[timestamp_type]
+    try:
+        return memo[value]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable, so it can't be remembered
+        return _parse(value, timestamp_type)
+    result = _parse(value, timestamp_type)
+    if len(memo) >= MEMO_SIZE:
+        memo.clear()
+    memo[value] = result
+    return result
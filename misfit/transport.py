@@ -0,0 +1,117 @@
+"""
+HTTP transport for the Misfit client. A transport owns a pool of connections
+to the API and can be shared by any number of :code:`misfit.Misfit` instances,
+each of which applies its own access token to every request it sends: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.transport import MisfitTransport
+    >>> transport = MisfitTransport(pool_maxsize=20)
+    >>> clients = [Misfit(<client_id>, <client_secret>, token,
+    ...                   transport=transport) for token in tokens]
+"""
+import requests
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import (
+    HTTPConnection,
+    HTTPSConnection
+)
+from requests.packages.urllib3.connectionpool import (
+    HTTPConnectionPool,
+    HTTPSConnectionPool
+)
+
+# Seconds spent opening connections by the current request of each thread
+_connect = threading.local()
+
+
+def connect_time():
+    """
+    Seconds the last request sent on this thread spent opening a connection,
+    0 if it reused one
+    """
+    return getattr(_connect, 'seconds', 0.0)
+
+
+class TimedConnectMixin(object):
+    def connect(self):
+        start = time.time()
+        try:
+            super(TimedConnectMixin, self).connect()
+        finally:
+            _connect.seconds = connect_time() + time.time() - start
+
+
+class TimedHTTPConnection(TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """ An HTTPAdapter whose connections time how long they take to open """
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+
+class MisfitTransport(object):
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False,
+                 keep_alive=True, timeout=None):
+        """
+        - pool_connections: The number of hosts to keep connection pools for
+        - pool_maxsize: The most connections to keep open to each host
+        - pool_block: Wait for a free connection instead of opening one that
+          won't be kept when the pool is full
+        - keep_alive: Reuse connections between requests
+        - timeout: Default timeout for each request, in seconds
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = TimedHTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+            pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def request(self, method, url, **kwargs):
+        """ Send a request on one of the pooled connections """
+        _connect.seconds = 0.0
+        if self.timeout is not None:
+            kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        """ Close all the pooled connections """
+        self.session.close()
+
+
+class TransportSession(object):
+    """
+    What slumber sees as its requests session. Every request is handed to the
+    ``send`` callable instead, which is how each Misfit client applies its own
+    access token to a shared transport.
+    """
+    def __init__(self, send):
+        self.send = send
+        self.auth = None
+
+    def request(self, method, url, **kwargs):
+        return self.send(method, url, **kwargs)
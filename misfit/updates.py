@@ -0,0 +1,148 @@
+"""
+Fetching what notifications say has changed. Rather than fetching an object
+for every :code:`misfit.notification.MisfitMessage`, give a batch of them to
+:code:`MisfitUpdates`: it keeps only the latest message about each object,
+skips objects that were deleted, and fetches the rest of each user's objects
+of a type by id or by a date range covering them, whichever takes fewer
+requests: ::
+
+    >>> from misfit import Misfit
+    >>> from misfit.updates import MisfitUpdates
+    >>> updates = MisfitUpdates(lambda owner_id: Misfit(
+    ...     <client_id>, <client_secret>, tokens[owner_id]))
+    >>> fetched, failures = updates.fetch(messages)
+    >>> for update in fetched:
+    ...     print(update.owner, update.type, update.action, update.object)
+
+Messages only say when an object was updated, not which day it belongs to, so
+a covering range runs from ``lookback_days`` before the earliest update to the
+latest one. Objects it doesn't turn up are fetched by id. Everything is
+fetched from the API rather than the clients' caches, and cached again.
+
+With a :code:`misfit.webhook.MisfitWebhook`, collect a few seconds of
+messages at a time with :code:`get_batch`, fetch them on a thread, and mark
+them done once they are handled: ::
+
+    >>> while True:
+    ...     messages = await webhook.get_batch(window=5)
+    ...     fetched, failures = await loop.run_in_executor(
+    ...         None, updates.fetch, messages)
+    ...     webhook.done(messages)
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from .misfit import RANGE_RESOURCES, pool_map
+from .timestamps import convert
+
+
+# The resource and date range of each type of message. Profiles and devices
+# have one object per user.
+MESSAGE_TYPES = {
+    'profiles': ('profile', None),
+    'devices': ('device', None),
+    'goals': ('goal', RANGE_RESOURCES['goal']),
+    'sessions': ('session', RANGE_RESOURCES['session']),
+    'sleeps': ('sleep', RANGE_RESOURCES['sleep'])
+}
+
+# What changed: the latest action on an object of a user, and the object, or
+# None if it was deleted or its type can't be fetched
+MisfitUpdate = namedtuple('MisfitUpdate', 'owner type id action object')
+
+
+def latest_messages(messages):
+    """
+    The latest message about each object, by updatedAt and then by order, as
+    a dict of (ownerId, type) to a dict of id to message
+    """
+    groups = {}
+    for message in messages:
+        objects = groups.setdefault((message.ownerId, message.type), {})
+        previous = objects.get(message.id)
+        if previous is None or _updated(message) >= _updated(previous):
+            objects[message.id] = message
+    return groups
+
+
+def _updated(message):
+    updated_at = message.data.get('updatedAt')
+    return convert(updated_at, 'epoch') if updated_at else 0
+
+
+class MisfitUpdates(object):
+    def __init__(self, clients, lookback_days=1, max_workers=4):
+        """
+        - clients: A function of an ownerId to the :code:`misfit.Misfit`
+          client to fetch that user's objects with
+        - lookback_days: Days before the earliest update that a covering
+          date range starts
+        - max_workers: The most users to fetch for at once, on a thread pool
+        """
+        self.clients = clients
+        self.lookback_days = lookback_days
+        self.max_workers = max_workers
+
+    def fetch(self, messages):
+        """
+        Fetch the objects created or updated by messages. Returns a list of
+        MisfitUpdates, one for each object, and a list of (ownerId, type,
+        exception) for the groups that failed to fetch.
+        """
+        groups = sorted(latest_messages(messages).items())
+        results = pool_map(self._fetch_group, groups, self.max_workers)
+        updates, failures = [], []
+        for (owner, message_type), (group_updates, error) in zip(
+                [key for key, objects in groups], results):
+            if error is None:
+                updates.extend(group_updates)
+            else:
+                failures.append((owner, message_type, error))
+        return updates, failures
+
+    def plan(self, message_type, objects):
+        """
+        The (start_date, end_date) range likely to cover the objects of a
+        type, given a dict of id to message, or (None, None) when there is
+        no telling. :code:`misfit.Misfit.objects` only fetches it when that
+        takes fewer requests than fetching the objects by id.
+        """
+        if MESSAGE_TYPES[message_type][1] is None:
+            return None, None
+        dates = [convert(message.data['updatedAt'], 'datetime').date()
+                 for message in objects.values()
+                 if message.data.get('updatedAt')]
+        if not dates or len(dates) < len(objects):
+            return None, None
+        start = min(dates) - timedelta(days=self.lookback_days)
+        return start.isoformat(), max(dates).isoformat()
+
+    def _fetch_group(self, group):
+        """ ([MisfitUpdate], None) for a group, or (None, exception) """
+        (owner, message_type), objects = group
+        try:
+            return self._fetch_objects(owner, message_type, objects), None
+        except Exception as exc:
+            return None, exc
+
+    def _fetch_objects(self, owner, message_type, objects):
+        fetch_ids = sorted(object_id for object_id, message in objects.items()
+                           if message.action != message.DELETED)
+        fetched = {}
+        if fetch_ids and message_type in MESSAGE_TYPES:
+            misfit = self.clients(owner)
+            resource, range_resource = MESSAGE_TYPES[message_type]
+            if range_resource is None:
+                # There's only one, so fetch it once for every message
+                obj = getattr(misfit, resource)(refresh=True)
+                fetched = dict((object_id, obj) for object_id in fetch_ids)
+            else:
+                start_date, end_date = self.plan(
+                    message_type, dict((object_id, objects[object_id])
+                                       for object_id in fetch_ids))
+                fetched = misfit.objects(resource, fetch_ids, start_date,
+                                         end_date, refresh=True)
+        return [MisfitUpdate(owner, message_type, object_id,
+                             objects[object_id].action,
+                             fetched.get(object_id))
+                for object_id in sorted(objects)]
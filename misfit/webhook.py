@@ -0,0 +1,404 @@
+"""
+Asyncio receiver of Misfit notifications. Requires Python 3.5+.
+:code:`MisfitWebhook` is an `ASGI <https://asgi.readthedocs.io/>`_
+application that accepts SNS POSTs, verifies them on a pool of threads,
+answers right away, and queues their messages for consumer coroutines: ::
+
+    >>> from misfit.webhook import MisfitWebhook
+    >>> webhook = MisfitWebhook(queue_size=10000, concurrency=8)
+    >>> async def handle(message):
+    ...     print(message.ownerId, message.type, message.action, message.id)
+    >>> webhook.start_consumers(handle, consumers=4)
+
+Run it with any ASGI server, or with :code:`serve`, which is what
+``misfit webhook`` does, printing each message as a line of JSON.
+
+The queue holds at most ``queue_size`` messages. When a notification arrives
+and its messages don't fit, it is either rejected with a 503, so SNS delivers
+it again later, or its messages are spilled to a file and queued again in
+order as the consumers catch up, by ``overflow``. Spilled messages that
+haven't been queued again yet are kept across restarts.
+
+Subscription confirmations are answered right away too, and confirmed in the
+background on threads of their own, so their retries don't hold up
+verifying, or by the ``confirm`` coroutine function if one is given.
+"""
+import asyncio
+import functools
+import logging
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import codec
+from .notification import MisfitMessage, MisfitNotification
+
+
+logger = logging.getLogger(__name__)
+
+# What can be done with a notification that doesn't fit in the queue
+OVERFLOW_ACTIONS = ('reject', 'spill')
+
+# The largest request body accepted, in bytes. SNS messages are at most 256KB.
+MAX_BODY = 512 * 1024
+
+# The most subscription confirmations to make at once
+CONFIRM_WORKERS = 2
+
+
+class MisfitWebhook(object):
+    def __init__(self, queue_size=1000, concurrency=4, overflow='reject',
+                 spill_path=None, certificates=None, max_body=MAX_BODY,
+                 confirm=None):
+        """
+        - queue_size: The most messages to hold for the consumers
+        - concurrency: The most notifications to verify at once, on a pool
+          of as many threads
+        - overflow: What to do with a notification whose messages don't fit
+          in the queue: 'reject' it, or 'spill' them to spill_path
+        - spill_path: The file to spill messages to. How far it has been
+          queued again is kept in spill_path + '.offset'.
+        - certificates: The :code:`misfit.notification.MisfitCertificateCache`
+          to verify signatures with, the process-wide one by default
+        - max_body: The largest request body to accept, in bytes
+        - confirm: A coroutine function to await with each subscription
+          confirmation instead of calling its confirm_subscription
+        """
+        if overflow not in OVERFLOW_ACTIONS:
+            raise ValueError('overflow must be one of %s' %
+                             ', '.join(OVERFLOW_ACTIONS))
+        if overflow == 'spill' and not spill_path:
+            raise ValueError('Spilling messages needs a spill_path')
+        self.queue_size = queue_size
+        self.concurrency = concurrency
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.certificates = certificates
+        self.max_body = max_body
+        self.confirm = confirm
+        # Subscription confirmations in progress
+        self.confirmations = set()
+        self.executor = ThreadPoolExecutor(concurrency)
+        self.confirm_executor = ThreadPoolExecutor(CONFIRM_WORKERS)
+        # Created by _create_queue on first use
+        self._queue = None
+        self._semaphore = None
+        self.counters = {'notifications': 0, 'messages': 0, 'rejected': 0,
+                         'spilled': 0, 'invalid': 0}
+        # Messages in the spill file that haven't been queued yet, from
+        # spill_offset on
+        self.spilled = 0
+        self.spill_offset = 0
+        self._spill_file = None
+        if spill_path and os.path.exists(spill_path):
+            spill_file = self._open_spill()
+            self.spill_offset = self._read_spill_offset()
+            if self.spill_offset > os.path.getsize(spill_path):
+                # The file was started over before the offset was
+                self.spill_offset = 0
+            spill_file.seek(self.spill_offset)
+            self.spilled = sum(1 for line in spill_file)
+
+    @property
+    def queue(self):
+        """ The asyncio.Queue of MisfitMessages """
+        self._create_queue()
+        return self._queue
+
+    async def __call__(self, scope, receive, send):
+        """ The ASGI application """
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        if scope['method'] != 'POST':
+            await self._respond(send, 405)
+            return
+        body = await self._read_body(receive)
+        if body is None:
+            await self._respond(send, 413)
+            return
+        try:
+            notification = await self.verify(body)
+        except Exception:
+            self.counters['invalid'] += 1
+            await self._respond(send, 400)
+            return
+        self.counters['notifications'] += 1
+        if notification.Type == 'SubscriptionConfirmation':
+            self._confirm(notification)
+        if notification.Type == 'Notification' and \
+                not self.put(notification.Message):
+            self.counters['rejected'] += 1
+            await self._respond(send, 503)
+            return
+        await self._respond(send, 200)
+
+    async def verify(self, body):
+        """ Parse and verify a notification on the thread pool """
+        self._create_queue()
+        parse = functools.partial(MisfitNotification,
+                                  certificates=self.certificates,
+                                  confirm=False)
+        async with self._semaphore:
+            return await asyncio.get_event_loop().run_in_executor(
+                self.executor, parse, body)
+
+    def put(self, messages):
+        """
+        Queue messages, or spill them when they don't fit and overflow is
+        'spill'. Returns False if they were rejected instead.
+        """
+        queue = self.queue
+        if not self.spilled and \
+                queue.maxsize - queue.qsize() >= len(messages):
+            for message in messages:
+                queue.put_nowait(message)
+            self.counters['messages'] += len(messages)
+            return True
+        if self.overflow != 'spill':
+            return False
+        # Once anything has spilled, later messages spill too, to keep order
+        spill_file = self._open_spill()
+        spill_file.write(b''.join(codec.dumps(message.data).encode('utf8') +
+                                  b'\n' for message in messages))
+        spill_file.flush()
+        self.spilled += len(messages)
+        self.counters['messages'] += len(messages)
+        self.counters['spilled'] += len(messages)
+        return True
+
+    async def get(self):
+        """ The next message, waiting for one if there are none """
+        if self.queue.empty() and self.spilled:
+            self._unspill()
+        return await self.queue.get()
+
+    async def get_batch(self, window, max_messages=None):
+        """
+        Wait for a message, then return it with the others that arrive in the
+        next ``window`` seconds, up to ``max_messages``. Pass the batch to
+        :code:`done` once it has been handled.
+        """
+        messages = [await self.get()]
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + window
+        while max_messages is None or len(messages) < max_messages:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                messages.append(await asyncio.wait_for(self.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return messages
+
+    def done(self, messages):
+        """
+        Mark messages from get_batch as handled, for
+        :code:`asyncio.Queue.join`
+        """
+        for message in messages:
+            self.queue.task_done()
+
+    async def consume(self, handler):
+        """
+        Await the coroutine function handler with each message, forever.
+        Exceptions it raises are logged and the next message is handled.
+        """
+        while True:
+            message = await self.get()
+            try:
+                await handler(message)
+            except Exception:
+                logger.exception('Error handling %s', message)
+            finally:
+                self.queue.task_done()
+
+    def start_consumers(self, handler, consumers=1):
+        """ Start consumer tasks that each await handler with messages """
+        return [asyncio.ensure_future(self.consume(handler))
+                for i in range(consumers)]
+
+    def close(self):
+        """ Shut the thread pools down and close the spill file """
+        self.executor.shutdown(wait=False)
+        self.confirm_executor.shutdown(wait=False)
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _confirm(self, notification):
+        """ Confirm a subscription in the background """
+        if self.confirm is not None:
+            future = asyncio.ensure_future(self.confirm(notification))
+        else:
+            future = asyncio.get_event_loop().run_in_executor(
+                self.confirm_executor, notification.confirm_subscription)
+        self.confirmations.add(future)
+        future.add_done_callback(self._confirmed)
+
+    def _confirmed(self, future):
+        self.confirmations.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error('Confirming a subscription failed: %r',
+                         future.exception())
+
+    def _create_queue(self):
+        """
+        Create the queue and the semaphore that limits verifying, once, from
+        the event loop that serves requests
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.queue_size)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    def _unspill(self):
+        """ Queue as many spilled messages as fit, oldest first """
+        spill_file = self._open_spill()
+        spill_file.seek(self.spill_offset)
+        while self.spilled and not self._queue.full():
+            line = spill_file.readline()
+            self._queue.put_nowait(MisfitMessage(codec.loads(line)))
+            self.spilled -= 1
+        self.spill_offset = spill_file.tell()
+        if not self.spilled:
+            # Everything has been queued, so start the file over
+            spill_file.seek(0)
+            spill_file.truncate()
+            self.spill_offset = 0
+        self._write_spill_offset()
+
+    def _open_spill(self):
+        """ The spill file, opened for reading and appending once """
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, 'a+b')
+        return self._spill_file
+
+    def _read_spill_offset(self):
+        try:
+            with open(self.spill_path + '.offset') as offset_file:
+                return int(offset_file.read())
+        except (IOError, ValueError):
+            return 0
+
+    def _write_spill_offset(self):
+        """ Save spill_offset, replacing the old one in one step """
+        offset_path = self.spill_path + '.offset'
+        with open(offset_path + '.tmp', 'w') as offset_file:
+            offset_file.write(str(self.spill_offset))
+        os.replace(offset_path + '.tmp', offset_path)
+
+    async def _read_body(self, receive):
+        """ The request body, or None if it is larger than max_body """
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            if len(body) > self.max_body:
+                return None
+            more_body = message.get('more_body', False)
+        return body
+
+    async def _respond(self, send, status):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-length', b'0')]})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+async def _handle_connection(app, reader, writer):
+    """ Serve HTTP/1.1 requests on a connection to an ASGI app """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, path = request_line.decode('latin1').split()[:2]
+            headers = []
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                name, value = line.decode('latin1').split(':', 1)
+                headers.append((name.strip().lower().encode('latin1'),
+                                value.strip().encode('latin1')))
+            length = int(dict(headers).get(b'content-length', 0))
+            if length > getattr(app, 'max_body', MAX_BODY):
+                writer.write(b'HTTP/1.1 413 Payload Too Large\r\n'
+                             b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+                break
+            body = await reader.readexactly(length)
+            scope = {'type': 'http', 'http_version': '1.1', 'method': method,
+                     'path': path.split('?')[0], 'headers': headers}
+            response = {}
+
+            async def receive():
+                return {'type': 'http.request', 'body': body,
+                        'more_body': False}
+
+            async def send(message):
+                response.update(message)
+            await app(scope, receive, send)
+            content = response.get('body', b'')
+            writer.write(('HTTP/1.1 %d \r\nContent-Length: %d\r\n\r\n' % (
+                response['status'], len(content))).encode('latin1') + content)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(app, host='127.0.0.1', port=8080):
+    """
+    Serve an ASGI app, like a MisfitWebhook, over plain HTTP/1.1 until
+    cancelled. Put it behind a proxy that terminates TLS.
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(app, reader, writer),
+        host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def main(host='127.0.0.1', port=8080, queue_size=1000, concurrency=4,
+         spill_path=None):
+    """
+    Receive notifications on host and port until interrupted, printing each
+    message as a line of JSON. Messages that don't fit in the queue are
+    spilled to spill_path if it is given, and rejected otherwise.
+    """
+    webhook = MisfitWebhook(
+        queue_size=queue_size, concurrency=concurrency,
+        overflow='spill' if spill_path else 'reject', spill_path=spill_path)
+
+    async def print_message(message):
+        print(codec.dumps(message.data))
+
+    async def run():
+        webhook.start_consumers(print_message)
+        await serve(webhook, host, port)
+    print('Receiving notifications on http://%s:%s/' % (host, port))
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        webhook.close()
+        loop.close()
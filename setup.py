@@ -25,6 +25,12 @@ setup(
     package_data={'': ['LICENSE']},
     include_package_data=True,
     install_requires=["setuptools"] + required,
+    extras_require={
+        'async': ['aiohttp>=1.0'],
+        'columnar': ['numpy>=1.7'],
+        'fastjson': ['orjson; python_version >= "3.6"',
+                     'ujson; python_version < "3.6"'],
+    },
     license=refind('__license__'),
     entry_points={
         'console_scripts': ['misfit=misfit.cli:main'],
@@ -41,6 +47,7 @@ setup(
         'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
         'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: Implementation :: PyPy'
     ),
 )
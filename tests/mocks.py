@@ -1,6 +1,7 @@
 import json
 
 from httmock import urlmatch
+from six.moves.urllib.parse import parse_qs, urlparse
 
 
 class MisfitHttMock:
@@ -19,6 +20,28 @@ class MisfitHttMock:
             response['content'] = json_file.read().encode('utf8')
         return response
 
+    @urlmatch(scheme='https', netloc=r'api\.misfitwearables\.com')
+    def date_range_http(self, url, request):
+        """
+        Like json_http, but only return the records whose date (or start time)
+        is between the start_date and end_date of the request. Each requested
+        range is saved in self.requested_ranges.
+        """
+        query = parse_qs(urlparse(request.url).query)
+        start_date, end_date = query['start_date'][0], query['end_date'][0]
+        self.requested_ranges = getattr(self, 'requested_ranges', [])
+        self.requested_ranges.append((start_date, end_date))
+        file_path = 'tests/files/responses/%s.json' % self.file_name_base
+        with open(file_path) as json_file:
+            content = json.load(json_file)
+        for key, records in content.items():
+            content[key] = [record for record in records if start_date <=
+                            (record.get('date') or record['startTime'][:10])
+                            <= end_date]
+        response = dict(self.response_tmpl)
+        response['content'] = json.dumps(content).encode('utf8')
+        return response
+
 
 @urlmatch(scheme='https', netloc=r'api\.misfitwearables\.com')
 def not_found(*args):
@@ -92,3 +115,52 @@ def sns_certificate(*args):
 def sns_subscribe(*args):
     """ Mock requests to the SNS SubscribeURL """
     return ''
+
+
+class AsyncSessionMock:
+    """
+    Stand-in for an aiohttp.ClientSession that answers every GET with the
+    given status code and content
+    """
+    def __init__(self, status=200, content=None, file_name_base=None):
+        if file_name_base:
+            file_path = 'tests/files/responses/%s.json' % file_name_base
+            with open(file_path) as json_file:
+                content = json_file.read()
+        self.status = status
+        self.content = content.encode('utf8')
+        self.headers = {'content-type': 'application/json; charset=utf-8'}
+        self.requests = []
+
+    def get(self, url, params=None, headers=None):
+        self.requests.append((url, params, headers))
+        return self
+
+    def _done(self, result):
+        import asyncio
+        future = asyncio.Future()
+        future.set_result(result)
+        return future
+
+    def __aenter__(self):
+        return self._done(self)
+
+    def __aexit__(self, *exc_info):
+        return self._done(None)
+
+    def read(self):
+        return self._done(self.content)
+
+
+class FakeClock:
+    """ A clock that only moves when something sleeps """
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
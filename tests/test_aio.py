@@ -0,0 +1,81 @@
+from __future__ import unicode_literals
+
+import arrow
+import json
+import unittest
+
+from nose.tools import eq_
+
+from misfit import MisfitGoal, MisfitProfile, MisfitSummary
+from misfit.exceptions import MisfitException, MisfitNotFoundError
+
+from .mocks import AsyncSessionMock
+
+try:
+    import asyncio
+    from misfit.aio import AsyncMisfit
+except (ImportError, SyntaxError):  # Python 2
+    AsyncMisfit = None
+
+
+@unittest.skipIf(AsyncMisfit is None, 'AsyncMisfit requires Python 3.5+')
+class TestAsyncMisfit(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_client(self, session, method, *args, **kwargs):
+        misfit = AsyncMisfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                             client_session=session,
+                             max_range_days=2)
+        return self.loop.run_until_complete(
+            getattr(misfit, method)(*args, **kwargs))
+
+    def test_profile(self):
+        """ Test retrieving a profile and the request that was made """
+        profile_dict = {'userId': 'FAKE_USER', 'name': 'Fake User'}
+        session = AsyncSessionMock(content=json.dumps(profile_dict))
+        profile = self.run_client(session, 'profile')
+        eq_(type(profile), MisfitProfile)
+        eq_(profile.data, profile_dict)
+        url, params, headers = session.requests[0]
+        eq_(url, 'https://api.misfitwearables.com/move/resource/v1/user/me/'
+                 'profile/')
+        eq_(params, {})
+        eq_(headers['Authorization'], 'Bearer FAKE_TOKEN')
+
+    def test_goal(self):
+        """ Test retrieving goals by object id and by date range """
+        session = AsyncSessionMock(file_name_base='goal_single')
+        goal = self.run_client(session, 'goal',
+                               object_id='51a4189acf12e53f81000001')
+        eq_(type(goal), MisfitGoal)
+        eq_(goal.date, arrow.get('2014-10-05'))
+        eq_(session.requests[0][0].split('/')[-2], '51a4189acf12e53f81000001')
+
+        # A 3 day range is fetched in 2 windows and merged in order
+        session = AsyncSessionMock(file_name_base='goal')
+        goal_list = self.run_client(session, 'goal', '2014-10-05',
+                                    '2014-10-07')
+        eq_(len(goal_list), 6)
+        eq_([params for url, params, headers in session.requests], [
+            {'start_date': '2014-10-05', 'end_date': '2014-10-06'},
+            {'start_date': '2014-10-07', 'end_date': '2014-10-07'}])
+
+        self.assertRaises(MisfitException, self.run_client, session, 'goal')
+
+    def test_summary(self):
+        """ Test that non-detail summaries of each window are added up """
+        session = AsyncSessionMock(file_name_base='summary')
+        summary = self.run_client(session, 'summary', '2014-12-10',
+                                  '2014-12-13')
+        eq_(type(summary), MisfitSummary)
+        eq_(summary.steps, 2 * 34030)
+
+    def test_not_found(self):
+        """ Test that HTTP errors are raised as Misfit exceptions """
+        session = AsyncSessionMock(status=404, content='Cannot GET')
+        self.assertRaises(MisfitNotFoundError, self.run_client, session,
+                          'session', object_id='404')
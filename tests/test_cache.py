@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from datetime import date
+from freezegun import freeze_time
+from httmock import HTTMock, urlmatch
+from mock import patch
+from nose.tools import eq_
+
+from misfit import Misfit
+from misfit.cache import MisfitMemoryCache, MisfitSqliteCache
+
+from .mocks import MisfitHttMock
+
+
+class CountingHttMock(MisfitHttMock):
+    """ Count the requests answered with the json file """
+    calls = 0
+
+    @urlmatch(scheme='https', netloc=r'api\.misfitwearables\.com')
+    def json_http(self, *args):
+        self.calls += 1
+        return MisfitHttMock.json_http(self, *args)
+
+
+class TestMisfitCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def caches(self, **kwargs):
+        db_path = os.path.join(self.tmp_dir, 'cache.db')
+        return [MisfitMemoryCache(**kwargs),
+                MisfitSqliteCache(db_path, **kwargs)]
+
+    @patch('misfit.cache.time.time')
+    def test_expire(self, time_mock):
+        """ Test that values expire after their ttl """
+        for cache in self.caches():
+            time_mock.return_value = 1000
+            cache.set('key', {'value': 1}, 10)
+            eq_(cache.get('key'), {'value': 1})
+            time_mock.return_value = 1011
+            eq_(cache.get('key'), None)
+            eq_(cache.get('other_key'), None)
+
+    @patch('misfit.cache.time.time')
+    def test_lru(self, time_mock):
+        """ Test that the least recently used values are evicted """
+        for cache in self.caches(maxsize=2):
+            for now, key in enumerate(['a', 'b', 'a', 'c']):
+                time_mock.return_value = 1000 + now
+                if cache.get(key) is None:
+                    cache.set(key, key, 60)
+            eq_([cache.get(key) for key in ['a', 'b', 'c']], ['a', None, 'c'])
+            cache.delete('a')
+            cache.delete('b')
+            eq_([cache.get(key) for key in ['a', 'b', 'c']], [None, None, 'c'])
+            cache.clear()
+            eq_(cache.get('c'), None)
+
+    def test_sqlite_persists(self):
+        """ Test that the SQLite cache can be reopened """
+        db_path = os.path.join(self.tmp_dir, 'cache.db')
+        cache = MisfitSqliteCache(db_path)
+        cache.set('key', [1, 2], 60)
+        cache.close()
+        eq_(MisfitSqliteCache(db_path).get('key'), [1, 2])
+
+    @freeze_time('2014-10-09')
+    def test_ttl_for(self):
+        """ Test ttls by resource, and for ranges in the past """
+        cache = MisfitMemoryCache(ttl=10, ttls={'activity/sleeps': 20},
+                                  history_ttl=30)
+        eq_(cache.ttl_for('profile', {}), 3600)
+        eq_(cache.ttl_for('activity/sleeps', {}), 20)
+        eq_(cache.ttl_for('activity/sessions', {'end_date': '2014-10-08'}), 10)
+        eq_(cache.ttl_for('activity/sessions', {'end_date': '2014-10-07'}), 30)
+        eq_(cache.ttl_for('activity/sessions', {'end_date': 'BAD'}), 10)
+        cache.history_ttl = None
+        eq_(cache.ttl_for('activity/sessions', {'end_date': '2014-10-07'}), 10)
+
+    def test_misfit(self):
+        """ Test that a Misfit client only fetches what isn't cached """
+        cache = MisfitMemoryCache()
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN', cache=cache)
+        mock = CountingHttMock('goal')
+        with HTTMock(mock.json_http):
+            misfit.goal('2014-10-05', '2014-10-07')
+            goals = misfit.goal('2014-10-05', '2014-10-07')
+            eq_(mock.calls, 1)
+            eq_(len(goals), 3)
+            # Dates are the same request as their ISO strings
+            misfit.goal(date(2014, 10, 5), date(2014, 10, 7))
+            eq_(mock.calls, 1)
+            misfit.goal('2014-10-05', '2014-10-06')
+            eq_(mock.calls, 2)
+            # Other users have their own cache entries
+            Misfit('FAKE_ID', 'FAKE_SECRET', 'OTHER_TOKEN',
+                   cache=cache).goal('2014-10-05', '2014-10-07')
+            eq_(mock.calls, 3)
+            Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                   cache=cache).goal('2014-10-05', '2014-10-07')
+            eq_(mock.calls, 3)
+        assert 'FAKE_TOKEN' not in ''.join(cache.values.keys())
+
+    def test_range_cache(self):
+        """ Test that only the days missing from the range cache are fetched """
+        for range_cache in self.caches():
+            misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                            range_cache=range_cache)
+            mock = MisfitHttMock('session')
+            with HTTMock(mock.date_range_http):
+                sessions = misfit.session('2014-10-06', '2014-10-06')
+                eq_(len(sessions), 1)
+                sessions = misfit.session('2014-10-01', '2014-10-10')
+                eq_([session.id for session in sessions],
+                    ['51a4189acf12e53f82000001', '51a4189acf12e53f82000002',
+                     '51a4189acf12e53f82000003'])
+                eq_(misfit.session('2014-10-03', '2014-10-07')[0].data,
+                    sessions[0].data)
+            eq_(sorted(mock.requested_ranges),
+                [('2014-10-01', '2014-10-05'), ('2014-10-06', '2014-10-06'),
+                 ('2014-10-07', '2014-10-10')])
+            # Requests for ranges the cache can't split are left alone
+            with HTTMock(MisfitHttMock('goal').json_http):
+                eq_(len(misfit.goal('BAD_START', 'BAD_END')), 3)
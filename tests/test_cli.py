@@ -30,6 +30,11 @@ class TestMisfitCli(TestMisfitBase):
             '--start_date': None,
             '--end_date': None,
             '--user_id': None,
+            '--host': '127.0.0.1',
+            '--port': '8080',
+            '--queue_size': '1000',
+            '--concurrency': '4',
+            '--spill': None,
             '--version': False,
             '--help': False,
             'authorize': False,
@@ -38,7 +43,8 @@ class TestMisfitCli(TestMisfitBase):
             'profile': False,
             'session': False,
             'sleep': False,
-            'summary': False
+            'summary': False,
+            'webhook': False
         }
 
     @patch('misfit.cli.MisfitCli')
@@ -178,6 +184,25 @@ class TestMisfitCli(TestMisfitBase):
         # Remove the test config we created
         os.remove(config_arguments['--config'])
 
+    def test_webhook(self):
+        """ Test that the webhook command runs misfit.webhook.main """
+        webhook_arguments = self.default_arguments.copy()
+        webhook_arguments.update({'webhook': True, '--port': '8000',
+                                  '--spill': 'spill.jsonl'})
+        if sys.version_info < (3, 5):
+            stdout_backup = sys.stdout
+            sys.stdout = StringIO()
+            MisfitCli(webhook_arguments)
+            eq_(sys.stdout.getvalue(), 'ERROR: misfit webhook requires '
+                'Python 3.5 or later.\n')
+            sys.stdout = stdout_backup
+            return
+        with patch('misfit.webhook.main') as main_mock:
+            MisfitCli(webhook_arguments)
+        main_mock.assert_called_once_with(
+            '127.0.0.1', 8000, queue_size=1000, concurrency=4,
+            spill_path='spill.jsonl')
+
     @patch('pprint.PrettyPrinter.pprint')
     def test_summary(self, pprint_mock):
         """ Check that we can get the summary with the API """
@@ -0,0 +1,161 @@
+import threading
+import time
+import unittest
+
+from httmock import HTTMock
+from nose.tools import eq_
+
+from misfit import Misfit
+from misfit.coalesce import MisfitCoalescer
+from misfit.exceptions import MisfitNotFoundError
+
+from .mocks import MisfitHttMock, not_found
+
+
+def wait_for_waiters(coalescer, count):
+    """ Wait until count callers are waiting on requests in progress """
+    while sum(flight.waiters for flight in
+              list(coalescer.flights.values())) < count:
+        time.sleep(0.001)
+
+
+class TestMisfitCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.coalescer = MisfitCoalescer()
+        self.release = threading.Event()
+        self.calls = []
+
+    def func(self, value):
+        self.calls.append(value)
+        self.release.wait()
+        if isinstance(value, Exception):
+            raise value
+        return {'value': value}
+
+    def run_callers(self, keys_values):
+        """
+        Call func through the coalescer on a thread for each (key, value),
+        only letting the calls finish once every caller has joined one
+        """
+        results = [None] * len(keys_values)
+
+        def caller(index, key, value):
+            try:
+                results[index] = self.coalescer.call(key, self.func, value)
+            except Exception as exc:
+                results[index] = exc
+        threads = [threading.Thread(target=caller, args=(index,) + key_value)
+                   for index, key_value in enumerate(keys_values)]
+        for thread in threads:
+            thread.start()
+        wait_for_waiters(self.coalescer, len(keys_values) - len(set(
+            key for key, value in keys_values)))
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        eq_(self.coalescer.in_flight(), 0)
+        return results
+
+    def test_shared(self):
+        """ Test that concurrent calls with a key share one call """
+        results = self.run_callers([('a', 1), ('a', 2), ('a', 3), ('b', 4)])
+        eq_(sorted(self.calls), [1, 4])
+        assert results[0] is results[1] is results[2]
+        eq_(results[3], {'value': 4})
+
+    def test_shared_exception(self):
+        """ Test that every caller gets the exception of a failed call """
+        error = ValueError('failed')
+        results = self.run_callers([('a', error), ('a', 2)])
+        eq_(self.calls, [error])
+        assert results[0] is results[1] is error
+
+    def test_key(self):
+        """ Test that the parameters are part of the key, in any order """
+        key = MisfitCoalescer.key
+        eq_(key('token', 'user/me/activity/summary', None,
+                {'start_date': '2014-10-05', 'end_date': '2014-10-08'}),
+            key('token', 'user/me/activity/summary', None,
+                {'end_date': '2014-10-08', 'start_date': '2014-10-05'}))
+        assert key('token', 'user/me/profile', None, {}) != \
+            key('other_token', 'user/me/profile', None, {})
+        assert key('token', 'user/me/profile', None, {}) != \
+            key('token', 'user/other/profile', None, {})
+        assert key('token', 'user/me/profile', None, {}) != \
+            key('token', 'user/me/profile', '1', {})
+
+
+class TestMisfitCoalescing(unittest.TestCase):
+    """ Test coalescing the requests of Misfit clients """
+    def setUp(self):
+        self.coalescer = MisfitCoalescer()
+        self.release = threading.Event()
+        self.calls = []
+
+    def misfits(self, count, user_ids=None):
+        return [Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                       user_id=user_ids[i] if user_ids else None,
+                       coalescer=self.coalescer) for i in range(count)]
+
+    def blocked(self, http):
+        """ A mock that records each request and waits for release """
+        def blocked_http(url, request):
+            self.calls.append(url.path)
+            self.release.wait()
+            return http(url, request)
+        return blocked_http
+
+    def run_threads(self, funcs, requests=1):
+        """
+        Call each function on a thread, only letting requests finish once
+        every other caller has joined one of them
+        """
+        results = [None] * len(funcs)
+
+        def caller(index):
+            try:
+                results[index] = funcs[index]()
+            except Exception as exc:
+                results[index] = exc
+        threads = [threading.Thread(target=caller, args=(index,))
+                   for index in range(len(funcs))]
+        for thread in threads:
+            thread.start()
+        wait_for_waiters(self.coalescer, len(funcs) - requests)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_summary(self):
+        """ Test that concurrent identical requests return the same data """
+        misfits = self.misfits(4)
+        with HTTMock(self.blocked(MisfitHttMock('summary').json_http)):
+            summaries = self.run_threads([
+                lambda misfit=misfit: misfit.summary('2014-10-05',
+                                                     '2014-10-08')
+                for misfit in misfits])
+        eq_(len(self.calls), 1)
+        eq_(len(set(summary.points for summary in summaries)), 1)
+        assert summaries[0] is not summaries[1]
+
+    def test_users(self):
+        """ Test that requests for different users aren't shared """
+        misfits = self.misfits(4, user_ids=['1', '1', '2', '2'])
+        with HTTMock(self.blocked(MisfitHttMock('profile').json_http)):
+            profiles = self.run_threads([
+                misfit.profile for misfit in misfits], requests=2)
+        eq_(sorted(self.calls), ['/move/resource/v1/user/1/profile/',
+                                 '/move/resource/v1/user/2/profile/'])
+        eq_(len(profiles), 4)
+
+    def test_errors(self):
+        """ Test that a failed request raises in every caller """
+        misfits = self.misfits(3)
+        with HTTMock(self.blocked(not_found)):
+            errors = self.run_threads([
+                lambda misfit=misfit: misfit.profile('404')
+                for misfit in misfits])
+        eq_(len(self.calls), 1)
+        for error in errors:
+            assert isinstance(error, MisfitNotFoundError)
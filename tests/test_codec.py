@@ -0,0 +1,49 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from nose.tools import eq_
+
+from misfit import codec
+
+
+class TestCodec(unittest.TestCase):
+    def tearDown(self):
+        codec.set_backend()
+
+    def installed(self):
+        backends = []
+        for name in codec.BACKENDS:
+            try:
+                codec.set_backend(name)
+            except ImportError:
+                continue
+            backends.append(name)
+        return backends
+
+    def test_default(self):
+        """ Test that the fastest installed backend is the default """
+        fastest = self.installed()[0]
+        eq_(codec.set_backend(), fastest)
+        eq_(codec.backend(), fastest)
+
+    def test_round_trip(self):
+        """ Test that every installed backend decodes text and bytes """
+        data = {'sessions': [{'id': '51a4189acf12e53f81000001',
+                              'startTime': '2014-10-05T10:26:54-04:00',
+                              'points': 394.4, 'steps': 1426,
+                              'name': 'été'}]}
+        backends = self.installed()
+        assert 'json' in backends
+        for name in backends:
+            eq_(codec.set_backend(name), name)
+            eq_(codec.backend(), name)
+            text = codec.dumps(data)
+            assert isinstance(text, type(''))
+            eq_(codec.loads(text), data)
+            eq_(codec.loads(text.encode('utf8')), data)
+            self.assertRaises(ValueError, codec.loads, 'I HAVE NO IDEA')
+
+    def test_unknown_backend(self):
+        """ Test that an unknown backend is rejected """
+        self.assertRaises(ValueError, codec.set_backend, 'simplejson2')
@@ -0,0 +1,69 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from httmock import HTTMock
+from nose.tools import eq_
+
+from misfit import Misfit
+from misfit.columnar import columns, utc_offset
+
+from .mocks import MisfitHttMock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestColumnar(unittest.TestCase):
+    def test_utc_offset(self):
+        eq_(utc_offset('2014-10-05T10:26:54-04:00'), -4 * 3600)
+        eq_(utc_offset('2014-10-05T10:26:54+0530'), 5.5 * 3600)
+        eq_(utc_offset('2014-12-11T19:21:18.852Z'), 0)
+        eq_(utc_offset('2014-10-05T10:26:54'), 0)
+
+
+@unittest.skipIf(numpy is None, 'Columnar results require NumPy')
+class TestColumnarNumpy(unittest.TestCase):
+    def setUp(self):
+        self.misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN')
+
+    def test_session(self):
+        """ Test sessions as a dict of columns """
+        with HTTMock(MisfitHttMock('session').json_http):
+            sessions = self.misfit.columns('session', '2014-10-05',
+                                           '2014-10-07')
+        eq_(list(sessions), ['id', 'activityType', 'startTime',
+                             'startTimeOffset', 'duration', 'points', 'steps',
+                             'calories', 'distance'])
+        eq_(sessions['activityType'].tolist(),
+            ['Cycling', 'Walking', 'Swimming'])
+        eq_(sessions['startTime'][0],
+            numpy.datetime64('2014-10-05T14:26:54', 's'))
+        eq_(sessions['startTimeOffset'].tolist(), [-4 * 3600] * 3)
+        local_days = (sessions['startTime'] +
+                      sessions['startTimeOffset'].astype('m8[s]'))
+        eq_(local_days.astype('M8[D]')[1], numpy.datetime64('2014-10-06'))
+        eq_(sessions['steps'].sum(), 1406 + 2780)
+        eq_(sessions['duration'].dtype, numpy.float64)
+
+    def test_summary(self):
+        """ Test summaries as a structured array """
+        with HTTMock(MisfitHttMock('summary_detail').json_http):
+            summary = self.misfit.columns('summary', '2014-10-05',
+                                          '2014-10-07', structured=True)
+        eq_(summary.shape, (3,))
+        eq_(summary['date'][2], numpy.datetime64('2014-10-07'))
+        eq_(summary[0]['steps'], 3650)
+        self.assertAlmostEqual(summary['distance'].sum(), 3.877)
+
+    def test_missing(self):
+        """ Test missing values and empty results """
+        sleeps = columns('sleep', [{'id': 'a', 'duration': 10},
+                                   {'autoDetected': True}])
+        eq_(sleeps['id'].tolist(), ['a', ''])
+        eq_(sleeps['autoDetected'].tolist(), [False, True])
+        assert numpy.isnat(sleeps['startTime']).all()
+        assert numpy.isnan(sleeps['duration'][1])
+        eq_(columns('goal', [], structured=True).shape, (0,))
@@ -0,0 +1,90 @@
+from __future__ import unicode_literals
+
+import arrow
+import json
+import unittest
+
+from httmock import HTTMock
+from nose.tools import eq_
+
+from misfit import Misfit, MisfitProfile
+from misfit.compact import (
+    CompactGoal,
+    CompactSession,
+    CompactSleep,
+    CompactSleepDetail,
+    CompactSummary,
+    compact_classes
+)
+
+from .mocks import MisfitHttMock
+
+
+class TestCompact(unittest.TestCase):
+    def setUp(self):
+        self.misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                             object_classes=compact_classes())
+
+    def load(self, name, key):
+        with open('tests/files/responses/%s.json' % name) as json_file:
+            return json.load(json_file)[key]
+
+    def test_session(self):
+        """ Test that compact records read like Misfit objects """
+        with HTTMock(MisfitHttMock('session').json_http):
+            sessions = self.misfit.session(start_date='2014-10-05',
+                                           end_date='2014-10-07')
+        session = sessions[0]
+        eq_(type(session), CompactSession)
+        assert not hasattr(session, '__dict__')
+        eq_(session.id, '51a4189acf12e53f82000001')
+        eq_(session.activityType, 'Cycling')
+        eq_(session.startTime, arrow.get('2014-10-05T10:26:54-04:00'))
+        assert session.startTime is session.startTime
+        eq_(session.data, self.load('session', 'sessions')[0])
+        parts = ('%s' % session).split(': ', 1)
+        eq_(json.loads(parts[1]), session.data)
+
+        # Fields can be overwritten, and missing ones raise AttributeError
+        session.startTime = arrow.get('2014-10-06')
+        eq_(session.startTime, arrow.get('2014-10-06'))
+        session = CompactSession({'id': 'fake', 'unknown': 1})
+        eq_(session.data, {'id': 'fake'})
+        self.assertRaises(AttributeError, getattr, session, 'startTime')
+        self.assertRaises(AttributeError, getattr, session, 'unknown')
+
+    def test_keep_data(self):
+        """ Test that the raw response can be kept """
+        record = {'id': 'fake', 'date': '2014-10-05', 'unknown': 1}
+        eq_(CompactGoal(record).data, {'id': 'fake', 'date': '2014-10-05'})
+        eq_(CompactGoal(record, keep_data=True).data, record)
+        classes = compact_classes(keep_data=True)
+        eq_(classes['goal'](record).data, record)
+        eq_(classes['profile'], MisfitProfile)
+
+    def test_sleep(self):
+        """ Test that sleep details are compact too """
+        with HTTMock(MisfitHttMock('sleep').json_http):
+            sleeps = self.misfit.sleep(start_date='2014-10-05',
+                                       end_date='2014-10-07')
+        sleep = sleeps[0]
+        eq_(type(sleep), CompactSleep)
+        eq_(len(sleep.sleepDetails), 5)
+        eq_(type(sleep.sleepDetails[1]), CompactSleepDetail)
+        eq_(sleep.sleepDetails[1].datetime,
+            arrow.get('2014-10-05T23:51:54-04:00'))
+        eq_(sleep.sleepDetails[1].value, 2)
+        eq_(sleep.data, self.load('sleep', 'sleeps')[0])
+
+    def test_goal_summary(self):
+        """ Test compact goals and summaries """
+        with HTTMock(MisfitHttMock('goal').json_http):
+            goal = self.misfit.goal('2014-10-05', '2014-10-07')[0]
+        eq_(type(goal), CompactGoal)
+        self.assertAlmostEqual(goal.percent_complete(), 50)
+        with HTTMock(MisfitHttMock('summary_detail').json_http):
+            summary = self.misfit.summary('2014-10-05', '2014-10-07',
+                                          detail=True)[0]
+        eq_(type(summary), CompactSummary)
+        eq_(summary.date, arrow.get('2014-10-05'))
+        eq_(summary.steps, 3650)
@@ -76,3 +76,20 @@ class TestMisfitExceptions(unittest.TestCase):
     def test_unknown_error2(self):
         with HTTMock(unknown_error2):
             self.assertRaises(MisfitUnknownError, self.misfit.profile)
+
+    def test_direct(self):
+        """ Test that direct requests raise the same exceptions """
+        self.misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                             direct=True)
+        for mock, exception in [(not_found, MisfitNotFoundError),
+                                (bad_gateway, MisfitBadGateway),
+                                (unauthorized, MisfitUnauthorized),
+                                (forbidden, MisfitForbidden),
+                                (rate_limit, MisfitRateLimitError),
+                                (unknown_error1, MisfitUnknownError),
+                                (unknown_error2, MisfitUnknownError)]:
+            with HTTMock(mock):
+                self.assertRaises(exception, self.misfit.profile, '404')
+        with HTTMock(invalid_parameters):
+            self.assertRaises(MisfitBadRequest, self.misfit.goal,
+                              'BAD_START_DATE', 'BAD_END_DATE')
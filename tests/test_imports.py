@@ -0,0 +1,78 @@
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+from nose.tools import eq_
+
+
+# Microseconds "import misfit" may take, as measured by -X importtime
+IMPORT_BUDGET = 20000
+
+# Seconds "misfit --version" may take, from importing the CLI to printing
+VERSION_BUDGET = 0.1
+
+# Modules that shouldn't be loaded until a feature that needs them is used
+HEAVY_MODULES = ['arrow', 'cherrypy', 'cryptography', 'multiprocessing.pool',
+                 'oauthlib', 'requests', 'slumber']
+
+
+def run_python(*args):
+    """ Run python in a fresh process from the top of the repository """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        (sys.executable,) + args, cwd=root, stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    eq_(process.returncode, 0, stderr)
+    return stdout.decode('utf8'), stderr.decode('utf8')
+
+
+def loaded_modules(statement):
+    """ The heavy modules loaded by running statement in a fresh process """
+    stdout, stderr = run_python('-c', '%s\nimport sys\nprint(" ".join(m for m'
+                                ' in %r if m in sys.modules))' %
+                                (statement, HEAVY_MODULES))
+    # The last line, after anything the statement printed
+    return stdout.splitlines()[-1].split()
+
+
+@unittest.skipIf(sys.version_info < (3, 7),
+                 'misfit loads its modules lazily on Python 3.7+')
+class TestImports(unittest.TestCase):
+    def test_import_misfit(self):
+        """ Test that importing misfit loads nothing heavy, quickly """
+        eq_(loaded_modules('import misfit'), [])
+        stdout, stderr = run_python('-X', 'importtime', '-c', 'import misfit')
+        cumulative = int(re.search(r'\|\s*(\d+) \| misfit$', stderr,
+                                   re.MULTILINE).group(1))
+        assert cumulative < IMPORT_BUDGET, cumulative
+
+    def test_version(self):
+        """ Test that misfit --version loads nothing heavy, quickly """
+        eq_(loaded_modules(
+            'import sys\nsys.argv = ["misfit", "--version"]\n'
+            'from misfit.cli import main\n'
+            'try:\n    main()\nexcept SystemExit:\n    pass'), [])
+        stdout, stderr = run_python('-c', '\n'.join([
+            'from timeit import default_timer',
+            'start = default_timer()',
+            'import sys',
+            'sys.argv = ["misfit", "--version"]',
+            'from misfit.cli import main',
+            'try:\n    main()\nexcept SystemExit:\n    pass',
+            'print(default_timer() - start)']))
+        seconds = float(stdout.splitlines()[-1])
+        assert seconds < VERSION_BUDGET, seconds
+
+    def test_lazy_features(self):
+        """ Test that features load what they need when they are used """
+        eq_(loaded_modules('from misfit import Misfit'),
+            ['oauthlib', 'requests', 'slumber'])
+        eq_(loaded_modules('import misfit.notification\nimport misfit.auth'),
+            ['oauthlib', 'requests', 'slumber'])
+        eq_(loaded_modules('from misfit import MisfitSession\n'
+                           'MisfitSession({"startTime": "2014-10-05"})'
+                           '.startTime'),
+            ['arrow', 'oauthlib', 'requests', 'slumber'])
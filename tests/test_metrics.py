@@ -0,0 +1,105 @@
+import time
+import unittest
+
+from httmock import HTTMock
+from nose.tools import eq_
+
+from misfit import Misfit
+from misfit.exceptions import MisfitNotFoundError
+from misfit.metrics import (
+    ConstructEvent,
+    Histogram,
+    MisfitMetrics,
+    RequestEvent
+)
+
+from .mocks import MisfitHttMock, not_found
+
+
+class TestMisfitMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MisfitMetrics()
+        self.events = []
+        self.metrics.add_hook(self.events.append)
+
+    def misfits(self):
+        return [Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN', direct=direct,
+                       metrics=self.metrics) for direct in [False, True]]
+
+    def test_histogram(self):
+        """ Test counting values by bucket and estimating quantiles """
+        histogram = Histogram([0.1, 1, float('inf')])
+        eq_(histogram.quantile(0.5), None)
+        for value in [0.05, 0.1, 0.5, 0.7, 5]:
+            histogram.observe(value)
+        eq_(histogram.counts, [2, 2, 1])
+        eq_(histogram.count, 5)
+        eq_(round(histogram.sum, 6), 6.35)
+        eq_(histogram.quantile(0.4), 0.1)
+        eq_(histogram.quantile(0.5), 1)
+        eq_(histogram.quantile(1), float('inf'))
+
+    def test_requests(self):
+        """ Test that each request and object batch makes an event """
+        for misfit in self.misfits():
+            self.metrics.reset()
+            del self.events[:]
+            with HTTMock(MisfitHttMock('session').json_http):
+                sessions = misfit.session('2014-10-05', '2014-10-08')
+            eq_([type(event) for event in self.events],
+                [RequestEvent, ConstructEvent])
+            request, construct = self.events
+            eq_(request.endpoint, 'activity/sessions')
+            eq_(request.user, misfit.user_key)
+            eq_(request.status, 200)
+            assert request.bytes > 0
+            for name in ['connect', 'ttfb', 'total', 'decode', 'client',
+                         'wait']:
+                assert getattr(request, name) >= 0, name
+            eq_(construct.endpoint, 'activity/sessions')
+            eq_(construct.objects, len(sessions))
+            counters = self.metrics.snapshot()['counters']
+            eq_(counters, {'requests': 1, 'errors': 0,
+                           'bytes': request.bytes, 'objects': len(sessions)})
+            eq_(self.metrics.endpoints, {'activity/sessions': 1})
+            eq_(self.metrics.histograms['total'].count, 1)
+
+    def test_rate_limiter_wait(self):
+        """ Test that waiting for the rate limiter isn't client time """
+        class SlowLimiter(object):
+            def acquire(self, access_token):
+                time.sleep(0.05)
+
+            def update(self, access_token, headers):
+                pass
+        for misfit in self.misfits():
+            misfit.rate_limiter = SlowLimiter()
+            del self.events[:]
+            with HTTMock(MisfitHttMock('goal').json_http):
+                misfit.goal('2014-10-05', '2014-10-07')
+            request = self.events[0]
+            assert request.wait >= 0.05, request
+            assert request.client < 0.05, request
+            assert self.metrics.histograms['wait'].sum >= 0.05
+
+    def test_errors(self):
+        """ Test that failed requests are counted by status """
+        for misfit in self.misfits():
+            self.metrics.reset()
+            with HTTMock(not_found):
+                self.assertRaises(MisfitNotFoundError, misfit.profile, '404')
+            eq_(self.metrics.counters['errors'], 1)
+            eq_(self.metrics.statuses, {404: 1})
+            eq_(self.metrics.counters['objects'], 0)
+
+    def test_stream(self):
+        """ Test that streamed requests aren't given a size or decode time """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        metrics=self.metrics)
+        with HTTMock(MisfitHttMock('sleep').json_http):
+            sleeps = list(misfit.iter_sleeps('2014-10-05', '2014-10-07'))
+        eq_(len(sleeps), 2)
+        request = self.events[0]
+        eq_((request.status, request.bytes, request.decode, request.client),
+            (200, None, None, None))
+        eq_(self.metrics.counters['requests'], 1)
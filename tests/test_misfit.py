@@ -5,10 +5,18 @@ import json
 import unittest
 import sys
 
+from array import array
 from httmock import HTTMock
 from nose.tools import eq_
 
-from misfit import Misfit, MisfitGoal, MisfitSummary
+from misfit import (
+    Misfit,
+    MisfitGoal,
+    MisfitSession,
+    MisfitSleep,
+    MisfitSleepDetail,
+    MisfitSummary
+)
 from misfit.exceptions import MisfitException
 
 from .mocks import MisfitHttMock
@@ -127,6 +135,121 @@ class TestMisfitAPI(unittest.TestCase):
         eq_(summary.activityCalories, summ_dict['activityCalories'])
         eq_(summary.distance, summ_dict['distance'])
 
+    def test_summary_detail_windows(self):
+        """
+        Test that a long summary range is split into windows which are merged
+        back together in date order
+        """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        max_range_days=2, max_workers=2)
+        mock = MisfitHttMock('summary_detail')
+        with HTTMock(mock.date_range_http):
+            summary_list = misfit.summary(
+                start_date='2014-10-04', end_date='2014-10-07', detail=True)
+        eq_(sorted(mock.requested_ranges), [('2014-10-04', '2014-10-05'),
+                                            ('2014-10-06', '2014-10-07')])
+        eq_([summ.date for summ in summary_list],
+            [arrow.get('2014-10-05'), arrow.get('2014-10-06'),
+             arrow.get('2014-10-07')])
+
+    def test_goal_windows(self):
+        """ Test that a range shorter than max_range_days isn't split """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        max_range_days=3)
+        mock = MisfitHttMock('goal')
+        with HTTMock(mock.date_range_http):
+            goal_list = misfit.goal(start_date='2014-10-05',
+                                    end_date='2014-10-07')
+        eq_(mock.requested_ranges, [('2014-10-05', '2014-10-07')])
+        eq_(len(goal_list), 3)
+
+        # One more day is one more window
+        mock.requested_ranges = []
+        with HTTMock(mock.date_range_http):
+            goal_list = misfit.goal(start_date='2014-10-05',
+                                    end_date='2014-10-08')
+        eq_(sorted(mock.requested_ranges), [('2014-10-05', '2014-10-07'),
+                                            ('2014-10-08', '2014-10-08')])
+        eq_([goal.id for goal in goal_list], [
+            '51a4189acf12e53f81000001', '51a4189acf12e53f81000002',
+            '51a4189acf12e53f81000003'])
+
+    def test_summary_windows(self):
+        """ Test that non-detail summaries of each window are added up """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        max_range_days=5)
+        with HTTMock(MisfitHttMock('summary').json_http):
+            summary = misfit.summary(start_date='2014-12-01',
+                                     end_date='2014-12-10')
+        eq_(type(summary), MisfitSummary)
+        eq_(summary.steps, 2 * 34030)
+        eq_(summary.points, 2 * 3550)
+
+    def test_session(self):
+        """ Test retrieving sessions by date range """
+        with HTTMock(MisfitHttMock('session').json_http):
+            session_list = self.misfit.session(start_date='2014-10-05',
+                                               end_date='2014-10-07')
+        eq_(len(session_list), 3)
+        session = session_list[0]
+        eq_(type(session), MisfitSession)
+        eq_(session.activityType, 'Cycling')
+        eq_(session.startTime, arrow.get('2014-10-05T10:26:54-04:00'))
+        eq_(session.duration, 900)
+
+    def test_sleep(self):
+        """ Test retrieving sleeps by date range """
+        with HTTMock(MisfitHttMock('sleep').json_http):
+            sleep_list = self.misfit.sleep(start_date='2014-10-05',
+                                           end_date='2014-10-07')
+        eq_(len(sleep_list), 2)
+        sleep = sleep_list[0]
+        eq_(type(sleep), MisfitSleep)
+        eq_(sleep.autoDetected, False)
+        eq_(sleep.startTime, arrow.get('2014-10-05T23:26:54-04:00'))
+        eq_(len(sleep.sleepDetails), 5)
+        eq_(type(sleep.sleepDetails[1]), MisfitSleepDetail)
+        eq_(sleep.sleepDetails[1].datetime,
+            arrow.get('2014-10-05T23:51:54-04:00'))
+        eq_(sleep.sleepDetails[1].value, 2)
+
+    def test_sleep_details(self):
+        """ Test that sleep details are only built when they are read """
+        with open('tests/files/responses/sleep.json') as json_file:
+            sleep = MisfitSleep(json.load(json_file)['sleeps'][0])
+        details = sleep.sleepDetails
+        eq_(details.objects, [None] * 5)
+        assert details[-1] is details[4]
+        eq_(details.objects.count(None), 4)
+        eq_([detail.value for detail in details[1:3]], [2, 3])
+        eq_([detail.value for detail in details], [1, 2, 3, 2, 1])
+        eq_(details, list(details))
+        assert details != None  # noqa: E711
+        assert details != 5
+        offsets, values = sleep.detail_arrays()
+        eq_(list(offsets), [0, 1500, 7800, 9900, 22800])
+        eq_(list(values), [1, 2, 3, 2, 1])
+        eq_(list(details.arrays()[0]), list(offsets))
+        eq_(MisfitSleep({'startTime': '2014-10-05'}).detail_arrays(),
+            (array('l'), array('l')))
+
+    def test_lazy_fields(self):
+        """
+        Test that fields are converted when first read, and only then
+        """
+        summary = MisfitSummary({'date': '2014-10-05', 'steps': 3650})
+        eq_(sorted(vars(summary)), ['data'])
+        eq_(summary.date, arrow.get('2014-10-05'))
+        eq_(sorted(vars(summary)), ['data', 'date'])
+        assert summary.date is summary.date
+        assert hasattr(summary, 'steps')
+        assert not hasattr(summary, 'points')
+        self.assertRaises(AttributeError, getattr, summary, '__setstate__')
+        # Attributes can be overridden
+        summary.steps = 0
+        eq_(summary.steps, 0)
+        eq_(summary.data['steps'], 3650)
+
     def assert_misfit_string(self, obj, data):
         """
         The string representing the misfit object should be the classname,
@@ -135,3 +258,10 @@ class TestMisfitAPI(unittest.TestCase):
         parts = ('%s' % obj).split(': ', 1)
         eq_(parts[0], '%s' % type(obj))
         eq_(json.loads(parts[1]), data)
+
+
+class TestMisfitDirectAPI(TestMisfitAPI):
+    """ The same tests, with requests sent straight to the transport """
+    def setUp(self):
+        self.misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                             direct=True)
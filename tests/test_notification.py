@@ -2,20 +2,44 @@ from __future__ import unicode_literals
 
 import arrow
 import json
+import requests
 import unittest
 import sys
 
 from base64 import standard_b64encode
 from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
 from httmock import HTTMock
-from nose.tools import eq_, ok_
+from mock import patch
+from multiprocessing.pool import ThreadPool
+from nose.tools import assert_raises, eq_, ok_
 
-from misfit.notification import MisfitMessage, MisfitNotification
+from misfit.notification import (
+    MisfitCertificateCache,
+    MisfitMessage,
+    MisfitNotification,
+    verify_notifications
+)
 
-from .mocks import sns_certificate, sns_subscribe
+from .mocks import FakeClock, sns_certificate, sns_subscribe
+
+
+class InlineExecutor(object):
+    """
+    Stand-in for a concurrent.futures executor, which Python 2 doesn't have,
+    that calls what is submitted right away
+    """
+    class Future(object):
+        def __init__(self, result):
+            self._result = result
+
+        def result(self):
+            return self._result
+
+    def submit(self, func):
+        return self.Future(func())
 
 
 class TestMisfitNotification(unittest.TestCase):
@@ -56,16 +80,16 @@ class TestMisfitNotification(unittest.TestCase):
         # and given a password of 'test'
         with open('tests/files/privkey.pem') as key_file:
             key_content = key_file.read().encode('utf8')
-        key = default_backend().load_pem_private_key(key_content, None)
+        key = serialization.load_pem_private_key(key_content, None,
+                                                 default_backend())
         strings_to_sign = {
             # Hardcode these so our test suite is less of an echo chamber
             'signed_confirmation': 'Message\nYou have chosen to subscribe to the topic arn:aws:sns:us-east-1:<number>:topic.\nTo confirm the subscription, visit the SubscribeURL included in this message.\nMessageId\nmessage-id\nSubscribeURL\nhttps://example-subscribe-url.com/path/to/verify_endpoint?verify_token=long_token&challenge=challenge\nTimestamp\n2014-12-11T19:21:18.852Z\nToken\nvery_long_token\nTopicArn\narn:aws:sns:us-east-1:<number>:topic\nType\nSubscriptionConfirmation\n',
             'notification': 'Message\n[{"type":"goals","id":"scrubbed_id","ownerId":"scrubbed_ownerId","action":"updated","updatedAt":"2014-12-11T20:23:43Z"}]\nMessageId\nmessage-id\nTimestamp\n2014-12-11T20:23:44.182Z\nTopicArn\ntopic-arn\nType\nNotification\n'
         }
         for message, string_to_sign in strings_to_sign.items():
-            signer = key.signer(PKCS1v15(), hashes.SHA1())
-            signer.update(string_to_sign.encode('utf8'))
-            signature = standard_b64encode(signer.finalize())
+            signature = standard_b64encode(key.sign(
+                string_to_sign.encode('utf8'), PKCS1v15(), hashes.SHA1()))
             getattr(self, message)['Signature'] = signature.decode('utf8')
 
     def test_message(self):
@@ -138,3 +162,139 @@ class TestMisfitNotification(unittest.TestCase):
                 pass
             except Exception:
                 self.fail('Should have raised InvalidSignature')
+
+    def test_certificate_cache(self):
+        """
+        Test that signing certificates are fetched once per ttl, and only
+        from trusted hosts
+        """
+        fetches = []
+
+        def counting_certificate(*args):
+            fetches.append(args[0].netloc)
+            return sns_certificate(*args)
+        clock = FakeClock()
+        patcher = patch('misfit.notification.time', clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        certificates = MisfitCertificateCache(ttl=60, maxsize=1)
+        notification_content = json.dumps(self.notification).encode('utf8')
+        with HTTMock(counting_certificate):
+            for i in range(3):
+                MisfitNotification(notification_content, certificates)
+            eq_(len(fetches), 1)
+            clock.now += 61
+            MisfitNotification(notification_content, certificates)
+            eq_(len(fetches), 2)
+        eq_(list(certificates.keys), [self.notification['SigningCertURL']])
+
+        for url in ['https://sns.us-east-1.amazonaws.com.example.com/a.pem',
+                    'http://sns.us-east-1.amazonaws.com/a.pem',
+                    'https://example.com/sns.us-east-1.amazonaws.com/a.pem']:
+            ok_(not certificates.is_trusted(url))
+            self.notification['SigningCertURL'] = url
+            notification_content = json.dumps(self.notification).encode(
+                'utf8')
+            self.assertRaises(InvalidSignature, MisfitNotification,
+                              notification_content, certificates)
+        eq_(len(fetches), 2)
+        ok_(certificates.is_trusted(
+            'https://sns.cn-north-1.amazonaws.com.cn/a.pem'))
+
+    def test_verify_notifications(self):
+        """
+        Test verifying a batch of notifications, with the failures reported
+        by index instead of raised
+        """
+        good = json.dumps(self.notification).encode('utf8')
+        bad_signature = json.dumps(
+            dict(self.notification, Signature='BAD_SIGNATURE')).encode('utf8')
+        untrusted = json.dumps(dict(
+            self.notification, SigningCertURL='https://example.com/a.pem'
+        )).encode('utf8')
+        unsigned = dict(self.notification)
+        del unsigned['Signature']
+        unsigned = json.dumps(unsigned).encode('utf8')
+        bodies = [good, bad_signature, b'not json', untrusted, good]
+        with HTTMock(sns_certificate):
+            notifications, failures = verify_notifications(
+                bodies, certificates=MisfitCertificateCache())
+        eq_([notification.MessageId for notification in notifications],
+            ['message-id', 'message-id'])
+        eq_(notifications[0].Message[0].id, 'scrubbed_id')
+        eq_([index for index, error in failures], [1, 2, 3])
+        ok_(isinstance(failures[0][1], InvalidSignature))
+        ok_(isinstance(failures[1][1], ValueError))
+        ok_(isinstance(failures[2][1], InvalidSignature))
+
+        # In worker processes, without fetching any certificates
+        notifications, failures = verify_notifications(
+            [unsigned, untrusted, unsigned], max_workers=2, processes=True)
+        eq_(len(notifications), 2)
+        eq_(notifications[1].Message[0].id, 'scrubbed_id')
+        eq_([index for index, error in failures], [1])
+        ok_(isinstance(failures[0][1], InvalidSignature))
+        assert_raises(ValueError, verify_notifications, [unsigned],
+                      processes=True, certificates=MisfitCertificateCache())
+
+        # On a pool that is kept open
+        pool = ThreadPool(2)
+        self.addCleanup(pool.terminate)
+        for i in range(2):
+            notifications, failures = verify_notifications(
+                [unsigned, b'not json'], pool=pool)
+            eq_(len(notifications), 1)
+            eq_([index for index, error in failures], [1])
+
+        # Subscription confirmations aren't confirmed unless asked to
+        subscribed = []
+
+        def counting_subscribe(*args):
+            subscribed.append(args[0].netloc)
+            return sns_subscribe(*args)
+        confirmation = json.dumps(self.confirmation).encode('utf8')
+        with HTTMock(counting_subscribe):
+            for processes in [False, True]:
+                notifications, failures = verify_notifications(
+                    [confirmation, confirmation], processes=processes)
+                eq_([notification.Type for notification in notifications],
+                    ['SubscriptionConfirmation'] * 2)
+            eq_(subscribed, [])
+            verify_notifications([confirmation], confirm=True)
+            eq_(subscribed, ['example-subscribe-url.com'])
+
+    def test_confirm_subscription(self):
+        """
+        Test confirming subscriptions later, in the background, and with
+        retries
+        """
+        clock = FakeClock()
+        patcher = patch('misfit.notification.time', clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        requested = []
+
+        def flaky_subscribe(*args):
+            requested.append(args[1].url)
+            if len(requested) == 1:
+                return {'status_code': 500, 'content': ''}
+            return sns_subscribe(*args)
+        content = json.dumps(self.confirmation).encode('utf8')
+        with HTTMock(flaky_subscribe):
+            confirmation = MisfitNotification(content, confirm=False)
+            eq_(requested, [])
+            eq_(confirmation.confirm_subscription().status_code, 200)
+            eq_(requested, [self.confirmation['SubscribeURL']] * 2)
+            eq_(clock.sleeps, [1])
+
+            confirmation = MisfitNotification(content,
+                                              confirm=InlineExecutor())
+            eq_(confirmation.confirmation.result().status_code, 200)
+            eq_(len(requested), 3)
+
+        def failing_subscribe(*args):
+            return {'status_code': 503, 'content': ''}
+        with HTTMock(failing_subscribe):
+            self.assertRaises(requests.HTTPError,
+                              confirmation.confirm_subscription, attempts=2)
+        eq_(clock.sleeps, [1, 1])
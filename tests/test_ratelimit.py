@@ -0,0 +1,83 @@
+import unittest
+
+from httmock import HTTMock
+from mock import patch
+from nose.tools import eq_
+
+from misfit import Misfit
+from misfit.exceptions import MisfitRateLimitError
+from misfit.ratelimit import MisfitRateLimiter, RateLimitBudget
+
+from .mocks import FakeClock, rate_limit
+
+
+class TestMisfitRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch('misfit.ratelimit.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def headers(self, remaining, reset_in, limit=150):
+        return {'x-ratelimit-limit': str(limit),
+                'x-ratelimit-remaining': str(remaining),
+                'x-ratelimit-reset': str(self.clock.now + reset_in)}
+
+    def test_unknown_budget(self):
+        """ Test that nothing waits until the API reports a budget """
+        limiter = MisfitRateLimiter(burst=2)
+        for i in range(5):
+            limiter.acquire('TOKEN')
+        limiter.update('TOKEN', {'content-type': 'application/json'})
+        limiter.acquire('TOKEN')
+        eq_(self.clock.sleeps, [])
+        eq_(limiter.budget('TOKEN'), RateLimitBudget(None, None, None))
+        eq_(limiter.budget(), RateLimitBudget(None, None, None))
+
+    def test_pacing(self):
+        """
+        Test that a token's remaining budget is spread out until the reset
+        """
+        limiter = MisfitRateLimiter(burst=2)
+        limiter.update('TOKEN', self.headers(remaining=10, reset_in=100))
+        eq_(limiter.budget('TOKEN'), RateLimitBudget(150, 10, 1100.0))
+        # A burst, then one request every 10 seconds
+        for i in range(4):
+            limiter.acquire('TOKEN')
+        eq_(self.clock.sleeps, [10, 10])
+        eq_(limiter.budget('TOKEN').remaining, 6)
+        # Other tokens have their own budget
+        limiter.acquire('OTHER_TOKEN')
+        eq_(len(self.clock.sleeps), 2)
+
+    def test_exhausted(self):
+        """ Test waiting for the reset when there is no budget left """
+        limiter = MisfitRateLimiter()
+        limiter.update('TOKEN', self.headers(remaining=0, reset_in=30))
+        limiter.acquire('TOKEN')
+        eq_(self.clock.sleeps, [30])
+        eq_(limiter.budget('TOKEN'), RateLimitBudget(150, 149, None))
+
+        # Don't wait longer than max_wait
+        limiter = MisfitRateLimiter(max_wait=10)
+        limiter.update('TOKEN', self.headers(remaining=0, reset_in=30))
+        self.assertRaises(MisfitRateLimitError, limiter.acquire, 'TOKEN')
+
+    def test_app_limit(self):
+        """ Test that the app-wide limit applies to all tokens together """
+        limiter = MisfitRateLimiter(app_limit=2, app_period=10)
+        limiter.acquire('TOKEN1')
+        limiter.acquire('TOKEN2')
+        eq_(limiter.budget(), RateLimitBudget(2, 0, None))
+        limiter.acquire('TOKEN3')
+        eq_(self.clock.sleeps, [5])
+
+    def test_misfit(self):
+        """ Test that Misfit updates the budget from response headers """
+        limiter = MisfitRateLimiter()
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        rate_limiter=limiter)
+        with HTTMock(rate_limit):
+            self.assertRaises(MisfitRateLimitError, misfit.profile)
+        eq_(limiter.budget('FAKE_TOKEN'),
+            RateLimitBudget(150, 148, 1418424178.0))
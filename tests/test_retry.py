@@ -0,0 +1,95 @@
+import unittest
+
+from httmock import HTTMock, urlmatch
+from mock import patch
+from nose.tools import eq_
+
+from misfit import Misfit
+from misfit.exceptions import (
+    MisfitBadGateway,
+    MisfitNotFoundError,
+    MisfitRateLimitError,
+    MisfitUnknownError
+)
+from misfit.retry import MisfitRetry
+
+from .mocks import bad_gateway, not_found
+
+
+class FlakyHttMock:
+    """ Return each response in turn, then a profile """
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    @urlmatch(scheme='https', netloc=r'api\.misfitwearables\.com')
+    def http(self, url, request):
+        self.calls += 1
+        if self.responses:
+            return self.responses.pop(0)
+        return {'status_code': 200, 'content': b'{"userId": "fake"}',
+                'headers': {'content-type': 'application/json'}}
+
+
+@patch('misfit.retry.time.sleep')
+class TestMisfitRetry(unittest.TestCase):
+    def test_transient(self, sleep_mock):
+        """ Test that transient errors are retried with growing backoff """
+        mock = FlakyHttMock({'status_code': 502, 'content': b'{}'},
+                            {'status_code': 500, 'content': b'{}'})
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        retry=MisfitRetry(backoff_factor=1, jitter=0))
+        with HTTMock(mock.http):
+            eq_(misfit.profile().userId, 'fake')
+        eq_(mock.calls, 3)
+        eq_([call[0][0] for call in sleep_mock.call_args_list], [1, 2])
+
+    def test_give_up(self, sleep_mock):
+        """
+        Test that we give up after max_attempts, and don't retry errors that
+        aren't transient
+        """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        retry=MisfitRetry(max_attempts=2))
+        with HTTMock(bad_gateway):
+            self.assertRaises(MisfitBadGateway, misfit.profile)
+        eq_(sleep_mock.call_count, 1)
+        with HTTMock(not_found):
+            self.assertRaises(MisfitNotFoundError, misfit.profile, '404')
+        eq_(sleep_mock.call_count, 1)
+
+    def test_backoff(self, sleep_mock):
+        """ Test the backoff curve, its cap and its jitter """
+        retry = MisfitRetry(max_attempts=10, backoff_factor=0.5,
+                            max_backoff=3, jitter=0)
+        error = MisfitUnknownError(500, 'Unknown error')
+        eq_([retry.delay(attempt, error) for attempt in range(1, 11)],
+            [0.5, 1, 2, 3, 3, 3, 3, 3, 3, None])
+        retry.jitter = 0.5
+        for i in range(20):
+            assert 1 <= retry.delay(3, error) <= 2
+
+    @patch('misfit.retry.time.time')
+    def test_rate_limit(self, time_mock, sleep_mock):
+        """ Test waiting for a rate limit to reset """
+        time_mock.return_value = 1418424170
+        retry = MisfitRetry(max_retry_after=10)
+        mock = FlakyHttMock({
+            'status_code': 429, 'content': b'{}',
+            'headers': {'x-ratelimit-reset': '1418424178'}})
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN', retry=retry)
+        with HTTMock(mock.http):
+            misfit.profile()
+        eq_(sleep_mock.call_args[0][0], 8)
+
+        # Retry-After takes precedence, in seconds or as an HTTP date
+        response = type('Response', (), {'headers': {
+            'retry-after': '3', 'x-ratelimit-reset': '1418424178'}})
+        error = MisfitRateLimitError(429, 'Rate limit exceeded', response)
+        eq_(retry.delay(1, error), 3)
+        response.headers['retry-after'] = 'Fri, 12 Dec 2014 22:42:55 GMT'
+        eq_(retry.delay(1, error), 5)
+
+        # Don't wait past max_retry_after
+        response.headers['retry-after'] = '11'
+        eq_(retry.delay(1, error), None)
@@ -0,0 +1,107 @@
+from __future__ import unicode_literals
+
+import arrow
+import json
+import unittest
+
+from httmock import HTTMock
+from nose.tools import eq_
+
+from misfit import Misfit, MisfitSleep
+from misfit.exceptions import MisfitNotFoundError
+from misfit.streaming import iter_json_array
+
+from .mocks import MisfitHttMock, not_found
+
+
+class TestStreaming(unittest.TestCase):
+    def chunked(self, text, size):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def test_iter_json_array(self):
+        """ Test decoding an array however the text is split """
+        records = [{'id': 1, 'name': 'a ] "quoted" [ b', 'values': [1, 2]},
+                   {'id': 2, 'nested': {'sessions': []}}, 12345, 'text']
+        text = json.dumps({'before': {'x': [1]}, 'sessions': records,
+                           'after': 1}, indent=2)
+        for size in [1, 2, 3, 7, len(text)]:
+            eq_(list(iter_json_array(self.chunked(text, size), 'sessions')),
+                records)
+        eq_(list(iter_json_array(['{"sessions": []}'], 'sessions')), [])
+        eq_(list(iter_json_array(['{"steps": 100}'], 'sessions')), [])
+        self.assertRaises(ValueError, list, iter_json_array(
+            self.chunked('{"sessions": [{"id": 1}, {"id"', 4), 'sessions'))
+
+    def test_top_level_key(self):
+        """ Test that the key only matches in the top level object """
+        text = json.dumps({
+            'note': 'not "sessions": [1]', 'nested': {'sessions': [2]},
+            'list': [{'sessions': [3]}], 'se\\"ssions': [4],
+            'sessions': [5, 6]})
+        for size in [1, 5, len(text)]:
+            eq_(list(iter_json_array(self.chunked(text, size), 'sessions')),
+                [5, 6])
+        eq_(list(iter_json_array(['{"sessions": null}'], 'sessions')), [])
+
+    def test_large_element(self):
+        """ Test decoding an element split over many chunks """
+        record = {'id': 1, 'values': list(range(20000)), 'text': 'x\\"' * 5}
+        text = json.dumps({'sessions': [record, record]})
+        decoded = []
+
+        class Decoder(json.JSONDecoder):
+            def decode(self, text):
+                decoded.append(len(text))
+                return json.JSONDecoder.decode(self, text)
+        eq_(list(iter_json_array(self.chunked(text, 100), 'sessions',
+                                 Decoder())), [record, record])
+        # Each element was decoded once, and never a partial one
+        eq_(len(decoded), 2)
+
+    def test_incremental(self):
+        """ Test that records are yielded before the response is read """
+        read = []
+
+        def chunks():
+            yield '{"sleeps": ['
+            for i in range(1000):
+                read.append(i)
+                yield '%s{"id": %d}' % (',' if i else '', i)
+            yield ']}'
+
+        records = iter_json_array(chunks(), 'sleeps')
+        eq_(next(records), {'id': 0})
+        eq_(len(read), 1)
+        eq_(len(list(records)), 999)
+
+    def test_iter_sleeps(self):
+        """ Test iterating over the sleeps of each window """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        max_range_days=2)
+        with HTTMock(MisfitHttMock('sleep').json_http):
+            sleeps = misfit.iter_sleeps('2014-10-05', '2014-10-07')
+            sleep = next(sleeps)
+            eq_(type(sleep), MisfitSleep)
+            eq_(sleep.startTime, arrow.get('2014-10-05T23:26:54-04:00'))
+            eq_(len(sleep.sleepDetails), 5)
+            # 2 windows of 2 sleeps
+            eq_(len(list(sleeps)), 3)
+
+    def test_iter_summary(self):
+        """ Test that only the records within each window are returned """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        max_range_days=2)
+        mock = MisfitHttMock('summary_detail')
+        with HTTMock(mock.date_range_http):
+            summary = list(misfit.iter_summary('2014-10-04', '2014-10-07'))
+        eq_([summ.data['date'] for summ in summary],
+            ['2014-10-05', '2014-10-06', '2014-10-07'])
+        eq_(mock.requested_ranges, [('2014-10-04', '2014-10-05'),
+                                    ('2014-10-06', '2014-10-07')])
+
+    def test_errors(self):
+        """ Test that errors raise the usual exceptions """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN')
+        with HTTMock(not_found):
+            self.assertRaises(MisfitNotFoundError, list,
+                              misfit.iter_goals('2014-10-05', '2014-10-07'))
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from httmock import HTTMock
+from nose.tools import eq_
+
+from misfit import Misfit
+from misfit.cache import MisfitMemoryCache
+from misfit.sync import MisfitSync
+
+from .mocks import MisfitHttMock
+
+
+class TestMisfitSync(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.sync = MisfitSync(os.path.join(tmp_dir, 'sync.db'),
+                               start_date='2014-10-01')
+        self.addCleanup(self.sync.close)
+        self.misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                             user_id='FAKE_USER')
+
+    def sync_sessions(self, end_date):
+        mock = MisfitHttMock('session')
+        with HTTMock(mock.date_range_http):
+            counts = self.sync.sync(self.misfit, ['session'], end_date)
+        return counts['session'], getattr(mock, 'requested_ranges', [])
+
+    def test_incremental(self):
+        """ Test that each sync only fetches the days since the last one """
+        eq_(self.sync_sessions('2014-10-05'),
+            (1, [('2014-10-01', '2014-10-05')]))
+        eq_(self.sync.mark('FAKE_USER', 'session'), '2014-10-05')
+        # The last day synced is fetched again, and updated in place
+        eq_(self.sync_sessions('2014-10-07'),
+            (3, [('2014-10-05', '2014-10-07')]))
+        eq_(self.sync_sessions('2014-10-07'),
+            (1, [('2014-10-07', '2014-10-07')]))
+        sessions = self.sync.records('FAKE_USER', 'session')
+        eq_([session['id'] for session in sessions],
+            ['51a4189acf12e53f82000001', '51a4189acf12e53f82000002',
+             '51a4189acf12e53f82000003'])
+        eq_(len(self.sync.records('FAKE_USER', 'session',
+                                  start_date='2014-10-06')), 2)
+        eq_(self.sync.records('OTHER_USER', 'session'), [])
+
+    def test_changed(self):
+        """ Test that changed days are fetched again by the next sync """
+        self.sync_sessions('2014-10-07')
+        self.sync.changed('FAKE_USER', 'session', '2014-10-05')
+        self.sync.changed('FAKE_USER', 'session', '2014-10-06')
+        # Days the next sync fetches anyway aren't queued
+        self.sync.changed('FAKE_USER', 'session', '2014-10-07')
+        eq_(self.sync.mark('FAKE_USER', 'session'), '2014-10-07')
+        eq_(self.sync_sessions('2014-10-07'),
+            (3, [('2014-10-05', '2014-10-06'), ('2014-10-07', '2014-10-07')]))
+        eq_(self.sync_sessions('2014-10-07'),
+            (1, [('2014-10-07', '2014-10-07')]))
+
+    def test_caches(self):
+        """ Test that days synced again aren't taken from the caches """
+        self.misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                             user_id='FAKE_USER', cache=MisfitMemoryCache(),
+                             range_cache=MisfitMemoryCache())
+        self.sync_sessions('2014-10-07')
+        self.sync.changed('FAKE_USER', 'session', '2014-10-05')
+        eq_(self.sync_sessions('2014-10-07'),
+            (2, [('2014-10-05', '2014-10-05'), ('2014-10-07', '2014-10-07')]))
+
+    def test_delete(self):
+        """ Test forgetting a deleted record """
+        self.sync_sessions('2014-10-07')
+        self.sync.delete('FAKE_USER', 'session', '51a4189acf12e53f82000002')
+        eq_(len(self.sync.records('FAKE_USER', 'session')), 2)
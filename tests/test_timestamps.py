@@ -0,0 +1,63 @@
+from __future__ import unicode_literals
+
+import arrow
+import unittest
+
+from datetime import date, datetime, timedelta
+from dateutil import tz
+from nose.tools import eq_
+
+from misfit import MisfitSession
+from misfit import timestamps
+from misfit.compact import CompactSession
+from misfit.timestamps import convert
+
+
+class TestTimestamps(unittest.TestCase):
+    def test_convert(self):
+        """ Test that the API's formats convert like arrow.get """
+        for value in ['2014-10-05', '2014-10-05T10:26:54-04:00',
+                      '2014-10-05T10:26:54+05:30', '2014-10-05T10:26:54Z',
+                      '2014-10-05T14:26:54.503Z', '2014-10-05T10:26:54',
+                      '2014-10-05T10:26:54-0400', '2014-10-05T10:26:54.5',
+                      1412519214]:
+            expected = arrow.get(value)
+            for converted in [convert(value), convert(value)]:
+                eq_(type(converted), arrow.Arrow)
+                eq_(converted, expected)
+                eq_(converted.utcoffset(), expected.utcoffset())
+            converted = convert(value, 'datetime')
+            eq_(type(converted), datetime)
+            eq_(converted, expected.datetime)
+            eq_(converted.utcoffset(), expected.utcoffset())
+            self.assertAlmostEqual(convert(value, 'epoch'),
+                                   expected.float_timestamp)
+        eq_(convert('2014-10-05T10:26:54-04:00', 'datetime'),
+            datetime(2014, 10, 5, 14, 26, 54, tzinfo=tz.tzutc()))
+        eq_(convert('2014-10-05T10:26:54-04:00', 'epoch'), 1412519214.0)
+
+    def test_memo(self):
+        """ Test that conversions are remembered, up to MEMO_SIZE of them """
+        assert convert('2014-10-06') is convert('2014-10-06')
+        memo = timestamps._memos['arrow']
+        memo.clear()
+        for day in range(timestamps.MEMO_SIZE + 1):
+            convert((date(2014, 1, 1) + timedelta(days=day)).isoformat())
+        eq_(len(memo), 1)
+
+    def test_timestamp_type(self):
+        """ Test that objects can convert timestamps to other types """
+        data = {'id': '51a4189acf12e53f82000001',
+                'startTime': '2014-10-05T10:26:54-04:00'}
+
+        class Session(MisfitSession):
+            timestamp_type = 'epoch'
+
+        class Compact(CompactSession):
+            timestamp_type = 'datetime'
+
+        eq_(Session(data).startTime, 1412519214.0)
+        eq_(Compact(data).startTime,
+            datetime(2014, 10, 5, 14, 26, 54, tzinfo=tz.tzutc()))
+        eq_(MisfitSession(data).startTime,
+            arrow.get('2014-10-05T10:26:54-04:00'))
@@ -0,0 +1,51 @@
+import unittest
+
+from httmock import HTTMock, urlmatch
+from nose.tools import eq_
+
+from misfit import Misfit
+from misfit.transport import MisfitTransport
+
+
+class TestMisfitTransport(unittest.TestCase):
+    def test_init(self):
+        """ Test that the connection pool is configured """
+        transport = MisfitTransport(pool_connections=2, pool_maxsize=20,
+                                    pool_block=True)
+        adapter = transport.session.get_adapter('https://api.misfit.com/')
+        eq_(adapter._pool_connections, 2)
+        eq_(adapter._pool_maxsize, 20)
+        eq_(adapter._pool_block, True)
+        eq_(transport.session.headers['Connection'], 'keep-alive')
+
+        transport = MisfitTransport(keep_alive=False)
+        eq_(transport.session.headers['Connection'], 'close')
+
+    def test_shared(self):
+        """
+        Test that Misfit instances can share a transport, and each request
+        still gets the access token of the instance that sent it
+        """
+        requests = []
+
+        @urlmatch(scheme='https', netloc=r'api\.misfitwearables\.com')
+        def profile_http(url, request):
+            requests.append(request)
+            return {'status_code': 200, 'content': b'{"userId": "fake"}',
+                    'headers': {'content-type': 'application/json'}}
+
+        transport = MisfitTransport(timeout=5)
+        misfit1 = Misfit('FAKE_ID', 'FAKE_SECRET', 'TOKEN1',
+                         transport=transport)
+        misfit2 = Misfit('FAKE_ID', 'FAKE_SECRET', 'TOKEN2',
+                         transport=transport)
+        eq_(misfit1.transport, misfit2.transport)
+        with HTTMock(profile_http):
+            misfit1.profile()
+            misfit2.profile()
+            misfit1.profile()
+        eq_([request.headers['Authorization'] for request in requests],
+            ['Bearer TOKEN1', 'Bearer TOKEN2', 'Bearer TOKEN1'])
+
+        # Instances get their own transport by default
+        assert Misfit('ID', 'SECRET', 'TOKEN').transport is not transport
@@ -0,0 +1,164 @@
+import json
+import unittest
+
+from httmock import HTTMock, urlmatch
+from nose.tools import assert_raises, eq_
+
+from misfit import Misfit, MisfitProfile, MisfitSession
+from misfit.cache import MisfitMemoryCache
+from misfit.exceptions import MisfitNotFoundError
+from misfit.notification import MisfitMessage
+from misfit.updates import MisfitUpdates, latest_messages
+
+from .mocks import MisfitHttMock
+
+
+SESSION_IDS = ['51a4189acf12e53f82000001', '51a4189acf12e53f82000002',
+               '51a4189acf12e53f82000003']
+
+
+def message(object_id, action='updated', updated_at='2014-10-07T12:00:00Z',
+            message_type='sessions', owner='owner'):
+    return MisfitMessage({'type': message_type, 'id': object_id,
+                          'ownerId': owner, 'action': action,
+                          'updatedAt': updated_at})
+
+
+class SessionHttMock(MisfitHttMock):
+    """ Answer sessions by date range or id, and profiles """
+    def __init__(self):
+        MisfitHttMock.__init__(self, 'session')
+        self.paths = []
+
+    @urlmatch(scheme='https', netloc=r'api\.misfitwearables\.com')
+    def sessions_http(self, url, request):
+        self.paths.append(url.path.split('/user/me/')[1])
+        if url.path.endswith('/profile/'):
+            return {'status_code': 200, 'headers': self.headers,
+                    'content': json.dumps({'userId': 'owner'})}
+        if url.path.endswith('/sessions/'):
+            return self.date_range_http(url, request)
+        object_id = url.path.rstrip('/').split('/')[-1]
+        with open('tests/files/responses/session.json') as json_file:
+            sessions = json.load(json_file)['sessions']
+        for session in sessions:
+            if session['id'] == object_id:
+                return {'status_code': 200, 'headers': self.headers,
+                        'content': json.dumps(session)}
+        return {'status_code': 404, 'content': 'Cannot GET %s' % url.path}
+
+
+class TestMisfitUpdates(unittest.TestCase):
+    def setUp(self):
+        self.mock = SessionHttMock()
+        self.updates = MisfitUpdates(lambda owner: Misfit(
+            'FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN'))
+
+    def fetch(self, messages):
+        with HTTMock(self.mock.sessions_http):
+            return self.updates.fetch(messages)
+
+    def test_latest_messages(self):
+        """ Test that later messages about an object supersede earlier ones """
+        groups = latest_messages([
+            message('1', 'created', '2014-10-07T10:00:00Z'),
+            message('1', 'deleted', '2014-10-07T12:00:00Z'),
+            message('1', 'updated', '2014-10-07T11:00:00Z'),
+            message('2', 'updated'),
+            message('2', 'updated', owner='other'),
+            message('3', 'updated', message_type='goals')])
+        eq_(sorted(groups), [('other', 'sessions'), ('owner', 'goals'),
+                             ('owner', 'sessions')])
+        eq_(dict((object_id, msg.action) for object_id, msg in
+                 groups[('owner', 'sessions')].items()),
+            {'1': 'deleted', '2': 'updated'})
+
+    def test_range(self):
+        """ Test fetching many objects with a covering date range """
+        messages = [message(object_id, updated_at=updated_at)
+                    for object_id, updated_at in zip(SESSION_IDS, [
+                        '2014-10-06T01:00:00Z', '2014-10-07T01:00:00Z',
+                        '2014-10-07T12:00:00Z'])]
+        updates, failures = self.fetch(messages * 2)
+        eq_(failures, [])
+        eq_(self.mock.requested_ranges, [('2014-10-05', '2014-10-07')])
+        eq_(len(self.mock.paths), 1)
+        eq_([update.id for update in updates], SESSION_IDS)
+        for update in updates:
+            eq_(type(update.object), MisfitSession)
+            eq_(update.object.id, update.id)
+            eq_((update.owner, update.type, update.action),
+                ('owner', 'sessions', 'updated'))
+
+    def test_by_id(self):
+        """
+        Test fetching by id when that takes fewer requests, or when a range
+        doesn't turn an object up
+        """
+        updates, failures = self.fetch([message(SESSION_IDS[2])])
+        eq_(self.mock.paths, ['activity/sessions/%s/' % SESSION_IDS[2]])
+        eq_(updates[0].object.id, SESSION_IDS[2])
+
+        # The first session started two days before it was updated
+        self.mock.paths = []
+        updates, failures = self.fetch([
+            message(SESSION_IDS[0], updated_at='2014-10-07T01:00:00Z'),
+            message(SESSION_IDS[1], updated_at='2014-10-07T01:00:00Z')])
+        eq_(self.mock.paths, ['activity/sessions/',
+                              'activity/sessions/%s/' % SESSION_IDS[0]])
+        eq_([update.object.id for update in updates], SESSION_IDS[:2])
+
+    def test_objects(self):
+        """ Test fetching objects by id through a covering date range """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN')
+        with HTTMock(self.mock.sessions_http):
+            sessions = misfit.objects('session', SESSION_IDS[:2],
+                                      '2014-10-05', '2014-10-06')
+            assert_raises(MisfitNotFoundError, misfit.objects, 'session',
+                          ['404'], '2014-10-05', '2014-10-06')
+        eq_(sorted(sessions), SESSION_IDS[:2])
+        eq_(type(sessions[SESSION_IDS[0]]), MisfitSession)
+        eq_(self.mock.paths, ['activity/sessions/', 'activity/sessions/404/'])
+
+    def test_caches(self):
+        """ Test that updated objects aren't taken from the caches """
+        misfit = Misfit('FAKE_ID', 'FAKE_SECRET', 'FAKE_TOKEN',
+                        cache=MisfitMemoryCache(),
+                        range_cache=MisfitMemoryCache())
+        self.updates.clients = lambda owner: misfit
+        messages = [message('p', message_type='profiles')] + [
+            message(object_id) for object_id in SESSION_IDS]
+        self.fetch(messages)
+        paths, self.mock.paths = self.mock.paths, []
+        updates, failures = self.fetch(messages)
+        eq_(failures, [])
+        eq_(len(updates), 4)
+        eq_(sorted(self.mock.paths), sorted(paths))
+        assert 'profile/' in paths
+
+    def test_deleted(self):
+        """ Test that deleted objects aren't fetched """
+        updates, failures = self.fetch([
+            message(SESSION_IDS[0], 'updated', '2014-10-07T10:00:00Z'),
+            message(SESSION_IDS[0], 'deleted', '2014-10-07T11:00:00Z')])
+        eq_(self.mock.paths, [])
+        eq_(updates, [(
+            'owner', 'sessions', SESSION_IDS[0], 'deleted', None)])
+
+    def test_profile(self):
+        """ Test that a user's profile is fetched once for every message """
+        updates, failures = self.fetch([
+            message('p1', message_type='profiles'),
+            message('p2', message_type='profiles'),
+            message('x', message_type='unknown')])
+        eq_(self.mock.paths, ['profile/'])
+        eq_([type(update.object) for update in updates],
+            [MisfitProfile, MisfitProfile, type(None)])
+
+    def test_failures(self):
+        """ Test that a failed fetch doesn't stop the rest """
+        updates, failures = self.fetch([
+            message(SESSION_IDS[0]), message('404', owner='other')])
+        eq_([update.id for update in updates], [SESSION_IDS[0]])
+        eq_([(owner, message_type) for owner, message_type, error in
+             failures], [('other', 'sessions')])
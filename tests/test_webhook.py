@@ -0,0 +1,231 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from httmock import HTTMock
+from nose.tools import eq_
+
+from misfit.notification import MisfitNotification
+
+from .mocks import sns_subscribe
+
+try:
+    import asyncio
+    from misfit.webhook import MisfitWebhook, _handle_connection
+except (ImportError, SyntaxError):  # Python 2
+    MisfitWebhook = None
+
+
+def notification_body(*ids):
+    """ An unsigned notification with a message for each id """
+    return json.dumps({
+        'Type': 'Notification', 'MessageId': 'message-id',
+        'TopicArn': 'topic-arn', 'Timestamp': '2014-12-11T20:23:44.182Z',
+        'Message': json.dumps([
+            {'type': 'sessions', 'id': object_id, 'ownerId': 'owner',
+             'action': 'updated', 'updatedAt': '2014-12-11T20:23:43Z'}
+            for object_id in ids])
+    }).encode('utf8')
+
+
+@unittest.skipIf(MisfitWebhook is None, 'MisfitWebhook requires Python 3.5+')
+class TestMisfitWebhook(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def done(self, result=None):
+        """
+        A future that is already done, to stand in for a coroutine without
+        syntax Python 2 can't compile
+        """
+        future = self.loop.create_future()
+        future.set_result(result)
+        return future
+
+    def post(self, webhook, body, method='POST'):
+        """ Send a request to the webhook, returning the response status """
+        sent = []
+
+        def receive():
+            return self.done({'type': 'http.request', 'body': body,
+                              'more_body': False})
+
+        def send(message):
+            sent.append(message)
+            return self.done()
+        scope = {'type': 'http', 'method': method, 'path': '/',
+                 'headers': []}
+        self.loop.run_until_complete(webhook(scope, receive, send))
+        return sent[0]['status']
+
+    def get_ids(self, webhook, count):
+        return [self.loop.run_until_complete(webhook.get()).id
+                for i in range(count)]
+
+    def test_queue(self):
+        """ Test that the messages of notifications are queued in order """
+        webhook = MisfitWebhook()
+        eq_(self.post(webhook, notification_body('1', '2')), 200)
+        eq_(self.post(webhook, notification_body('3')), 200)
+        eq_(self.get_ids(webhook, 3), ['1', '2', '3'])
+        eq_(webhook.counters['notifications'], 2)
+        eq_(webhook.counters['messages'], 3)
+        webhook.close()
+
+    def test_bad_requests(self):
+        """ Test rejecting requests that aren't valid notifications """
+        webhook = MisfitWebhook(max_body=1000)
+        eq_(self.post(webhook, b'', method='GET'), 405)
+        eq_(self.post(webhook, b'not json'), 400)
+        eq_(self.post(webhook, notification_body(*range(100))), 413)
+        eq_(webhook.counters['invalid'], 1)
+        webhook.close()
+
+    def test_reject(self):
+        """ Test rejecting notifications that don't fit in the queue """
+        webhook = MisfitWebhook(queue_size=2)
+        eq_(self.post(webhook, notification_body('1')), 200)
+        eq_(self.post(webhook, notification_body('2', '3')), 503)
+        eq_(self.post(webhook, notification_body('2')), 200)
+        eq_(self.get_ids(webhook, 2), ['1', '2'])
+        eq_(webhook.counters['rejected'], 1)
+        webhook.close()
+
+    def test_spill(self):
+        """
+        Test spilling messages that don't fit in the queue, and queueing them
+        again in order, also after a restart
+        """
+        spill_path = os.path.join(self.tmp_dir, 'spill.jsonl')
+        self.assertRaises(ValueError, MisfitWebhook, overflow='spill')
+        webhook = MisfitWebhook(queue_size=2, overflow='spill',
+                                spill_path=spill_path)
+        for ids in [('1',), ('2', '3'), ('4',), ('5',)]:
+            eq_(self.post(webhook, notification_body(*ids)), 200)
+        eq_(webhook.counters['spilled'], 4)
+        eq_(self.get_ids(webhook, 3), ['1', '2', '3'])
+        webhook.close()
+        # A restart only queues the messages that weren't queued yet
+        restarted = MisfitWebhook(queue_size=2, overflow='spill',
+                                  spill_path=spill_path)
+        eq_(restarted.spilled, 2)
+        eq_(self.post(restarted, notification_body('6')), 200)
+        eq_(self.get_ids(restarted, 3), ['4', '5', '6'])
+        eq_(os.path.getsize(spill_path), 0)
+        restarted.close()
+        restarted = MisfitWebhook(overflow='spill', spill_path=spill_path)
+        eq_(restarted.spilled, 0)
+        restarted.close()
+
+    def test_consumers(self):
+        """ Test that consumers are given every message """
+        webhook = MisfitWebhook()
+        handled = []
+
+        def handle(message):
+            if message.id == 'error':
+                raise ValueError(message.id)
+            handled.append(message.id)
+            return self.done()
+        tasks = webhook.start_consumers(handle, consumers=2)
+        eq_(self.post(webhook, notification_body('1', 'error', '2')), 200)
+        self.loop.run_until_complete(webhook.queue.join())
+        eq_(sorted(handled), ['1', '2'])
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(
+            *tasks, return_exceptions=True))
+        webhook.close()
+
+    def test_serve(self):
+        """ Test receiving notifications over HTTP """
+        webhook = MisfitWebhook()
+        server = self.loop.run_until_complete(asyncio.start_server(
+            lambda reader, writer: _handle_connection(webhook, reader,
+                                                      writer),
+            '127.0.0.1', 0))
+        port = server.sockets[0].getsockname()[1]
+
+        run = self.loop.run_until_complete
+        reader, writer = run(asyncio.open_connection('127.0.0.1', port))
+        statuses = []
+        for body in [notification_body('1'), b'not json',
+                     notification_body('2')]:
+            writer.write(b'POST / HTTP/1.1\r\nHost: localhost\r\n'
+                         b'Content-Length: %d\r\n\r\n' % len(body) + body)
+            statuses.append(int(run(reader.readline()).split()[1]))
+            while run(reader.readline()).strip():
+                pass
+        writer.close()
+        eq_(statuses, [200, 400, 200])
+        eq_(self.get_ids(webhook, 2), ['1', '2'])
+        server.close()
+        self.loop.run_until_complete(server.wait_closed())
+        webhook.close()
+
+    def test_confirm(self):
+        """
+        Test that subscription confirmations are answered before they are
+        confirmed in the background
+        """
+        body = json.dumps({
+            'Type': 'SubscriptionConfirmation', 'Token': 'token',
+            'TopicArn': 'topic-arn', 'Message': 'Confirm', 'MessageId': 'id',
+            'SubscribeURL': 'https://example-subscribe-url.com/confirm',
+            'Timestamp': '2014-12-11T19:21:18.852Z'}).encode('utf8')
+        release_verifying = threading.Event()
+        pending, confirmed = [], []
+
+        def confirm(notification):
+            future = self.loop.create_future()
+            pending.append((future, notification))
+            return future
+        webhook = MisfitWebhook(confirm=confirm)
+        eq_(self.post(webhook, body), 200)
+        eq_(len(webhook.confirmations), 1)
+        for future, notification in pending:
+            confirmed.append(notification.SubscribeURL)
+            future.set_result(None)
+        self.loop.run_until_complete(asyncio.gather(*webhook.confirmations))
+        eq_(confirmed, ['https://example-subscribe-url.com/confirm'])
+        eq_(webhook.confirmations, set())
+        webhook.close()
+
+        # By default on threads of their own, not the verifying ones
+        webhook = MisfitWebhook(concurrency=1)
+        self.addCleanup(release_verifying.set)
+        webhook.executor.submit(release_verifying.wait)
+        with HTTMock(sns_subscribe):
+            webhook._confirm(MisfitNotification(body, confirm=False))
+            self.loop.run_until_complete(asyncio.wait_for(
+                asyncio.gather(*webhook.confirmations), 5))
+        webhook.close()
+
+    def test_get_batch(self):
+        """ Test collecting the messages that arrive within a window """
+        webhook = MisfitWebhook()
+        eq_(self.post(webhook, notification_body('1', '2', '3')), 200)
+
+        batches = [self.loop.run_until_complete(webhook.get_batch(
+            0.01, max_messages=2)),
+            self.loop.run_until_complete(webhook.get_batch(0.01))]
+        eq_([[msg.id for msg in batch] for batch in batches],
+            [['1', '2'], ['3']])
+        # Joining the queue waits until every batch is done
+        join = asyncio.ensure_future(webhook.queue.join(), loop=self.loop)
+        webhook.done(batches[0])
+        self.loop.run_until_complete(asyncio.sleep(0))
+        eq_(join.done(), False)
+        webhook.done(batches[1])
+        self.loop.run_until_complete(join)
+        webhook.close()